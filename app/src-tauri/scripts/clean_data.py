@@ -10,19 +10,34 @@ import argparse
 import json
 import os
 import re
-import hashlib
 import difflib
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
+from events import FLUSH_INTERVAL, batch_events, captured_events, emit, flush_events, json_bytes
 from i18n import t, init_i18n, add_lang_arg
 
-
-def emit(event_type, **kwargs):
-    """Emit a JSON event line to stdout for Rust to parse."""
-    payload = {"type": event_type, **kwargs}
-    print(json.dumps(payload, ensure_ascii=False), flush=True)
-
+# Patterns used on every cleaned file; compiled once at import.
+_NOISE_RE = re.compile(r"<[^>]+>|https?://\S+")
+_WS_RE = re.compile(r"[ \t]+")
+_NL_RE = re.compile(r"\n{3,}")
+# Leading/trailing whitespace of every line (same set str.strip() removes)
+_LINE_EDGE_RE = re.compile(r"^[^\S\n]+|[^\S\n]+$", re.MULTILINE)
+# Heading lines (markdown "#" or Chinese 第N章/节/部分); [^\S\n] keeps matches on one line
+_HEADING_RE = re.compile(r"^[^\S\n]*(#{1,6}[^\S\n]+\S+|第[一二三四五六七八九十\d]+[章节部分])", re.MULTILINE)
+_FENCE_RE = re.compile(r"(```[\s\S]*?```)")
+_BLANK_RE = re.compile(r"\n{2,}")
+# Encoding sniffing for non-UTF-8 plain text
+_SNIFF_BYTES = 32768
+_FALLBACK_ENCODINGS = ("gbk", "gb2312", "gb18030", "big5", "latin-1")
+
+_PRIVACY_PATTERNS = [
+    (re.compile(r"\b1[3-9]\d{9}\b"), "[手机号]"),
+    (re.compile(r"\b[\w.+-]+@[\w.-]+\.[A-Za-z]{2,}\b"), "[邮箱]"),
+    (re.compile(r"\b\d{17}[\dXx]\b"), "[身份证号]"),
+    (re.compile(r"\b\d{15}\b"), "[身份证号]"),
+]
 
 def fix_encoding(text):
     """Try to fix common encoding issues."""
@@ -30,31 +45,58 @@ def fix_encoding(text):
     return text.encode("utf-8", errors="replace").decode("utf-8")
 
 
-def remove_noise(text):
-    """Remove common noise patterns."""
-    # Remove HTML tags
-    text = re.sub(r"<[^>]+>", "", text)
-    # Remove URLs
-    text = re.sub(r"https?://\S+", "", text)
+def decode_text(raw):
+    """Decode raw file bytes, sniffing the encoding once instead of trial-decoding.
+
+    The sniff is restricted to the legacy encodings this pipeline supports;
+    unguessable input falls back to trying them in order.
+    """
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        from_bytes = None
+    if from_bytes is not None:
+        best = from_bytes(raw[:_SNIFF_BYTES], cp_isolation=list(_FALLBACK_ENCODINGS)).best()
+        if best is not None:
+            try:
+                return raw.decode(best.encoding)
+            except (UnicodeDecodeError, UnicodeError, LookupError):
+                pass
+
+    for enc in _FALLBACK_ENCODINGS:
+        try:
+            return raw.decode(enc)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    return None
+
+
+def remove_noise(text, ext=""):
+    """Remove common noise patterns.
+
+    For code and structured files `<...>` and URLs are usually content
+    (generics, comparisons, config values), so only whitespace is normalized.
+    """
+    # Remove HTML tags and URLs in a single pass
+    if ext not in KEEP_MARKUP_EXTS:
+        text = _NOISE_RE.sub("", text)
     # Remove excessive whitespace
-    text = re.sub(r"[ \t]+", " ", text)
+    text = _WS_RE.sub(" ", text)
     # Remove excessive newlines (3+ -> 2)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _NL_RE.sub("\n\n", text)
     # Strip lines
-    lines = [line.strip() for line in text.split("\n")]
-    return "\n".join(lines)
+    return _LINE_EDGE_RE.sub("", text)
 
 
 def apply_privacy_filter(text):
     """Mask common PII patterns while keeping sentence structure."""
-    patterns = [
-        (re.compile(r"\b1[3-9]\d{9}\b"), "[手机号]"),
-        (re.compile(r"\b[\w.+-]+@[\w.-]+\.[A-Za-z]{2,}\b"), "[邮箱]"),
-        (re.compile(r"\b\d{17}[\dXx]\b"), "[身份证号]"),
-        (re.compile(r"\b\d{15}\b"), "[身份证号]"),
-    ]
     out = text
-    for pat, repl in patterns:
+    for pat, repl in _PRIVACY_PATTERNS:
         out = pat.sub(repl, out)
     return out
 
@@ -64,9 +106,10 @@ def dedup_paragraphs(paragraphs):
     seen = set()
     unique = []
     for p in paragraphs:
-        h = hashlib.md5(p.strip().encode()).hexdigest()
-        if h not in seen and len(p.strip()) > 0:
-            seen.add(h)
+        # set already hashes the string; no need for a separate digest
+        stripped = p.strip()
+        if stripped and stripped not in seen:
+            seen.add(stripped)
             unique.append(p)
     return unique
 
@@ -89,6 +132,25 @@ def fuzzy_dedup_paragraphs(paragraphs, threshold=0.85):
     return unique
 
 
+def near_dedup_paragraphs(paragraphs, threshold=0.85, num_perm=64, shingle=5):
+    """Remove near-duplicate paragraphs with MinHash-LSH over character shingles."""
+    from datasketch import MinHash, MinHashLSH
+
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+    unique = []
+    for idx, para in enumerate(paragraphs):
+        text = para.strip()
+        minhash = MinHash(num_perm=num_perm)
+        minhash.update_batch(
+            [text[i:i + shingle].encode("utf-8") for i in range(max(1, len(text) - shingle + 1))]
+        )
+        if lsh.query(minhash):
+            continue
+        lsh.insert(idx, minhash)
+        unique.append(para)
+    return unique
+
+
 def filter_short(paragraphs, min_chars=20):
     """Remove paragraphs shorter than min_chars."""
     return [p for p in paragraphs if len(p.strip()) >= min_chars]
@@ -100,7 +162,7 @@ def smart_segment(text, max_tokens=1024):
     avg_char_per_token = 2.5
     max_chars = int(max_tokens * avg_char_per_token)
 
-    paragraphs = text.split("\n\n")
+    paragraphs = _BLANK_RE.split(text)
     segments = []
     current = ""
 
@@ -117,12 +179,13 @@ def smart_segment(text, max_tokens=1024):
     return segments
 
 
-MARKDOWN_EXTS = {".md", ".markdown"}
-CODE_EXTS = {
+MARKDOWN_EXTS = frozenset({".md", ".markdown"})
+CODE_EXTS = frozenset({
     ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".c", ".cpp", ".h", ".hpp",
     ".go", ".rs", ".swift", ".kt", ".sql", ".sh", ".bash", ".zsh",
-}
-STRUCTURED_EXTS = {".json", ".jsonl", ".csv", ".tsv", ".xml", ".yaml", ".yml"}
+})
+STRUCTURED_EXTS = frozenset({".json", ".jsonl", ".csv", ".tsv", ".xml", ".yaml", ".yml"})
+KEEP_MARKUP_EXTS = CODE_EXTS | STRUCTURED_EXTS
 
 
 def _max_chars(max_tokens=1024):
@@ -131,52 +194,36 @@ def _max_chars(max_tokens=1024):
 
 def _pack_units(units, max_chars):
     """Pack logical units into chunks near max_chars."""
-    segments = []
-    current = ""
-
-    for unit in units:
-        part = unit.strip()
-        if not part:
-            continue
-        if not current:
-            current = part
-            continue
-        if len(current) + len(part) + 2 > max_chars:
-            segments.append(current.strip())
-            current = part
+    parts = [p for p in (unit.strip() for unit in units) if p]
+
+    # Plan chunk boundaries from lengths alone, then join each chunk once
+    # instead of growing a string by repeated concatenation.
+    cuts = []
+    size = -2  # no open chunk yet; its first part carries no "\n\n"
+    for i, part in enumerate(parts):
+        if size >= 0 and size + len(part) + 2 > max_chars:
+            cuts.append(i)
+            size = len(part)
         else:
-            current = current + "\n\n" + part
+            size += len(part) + 2
 
-    if current.strip():
-        segments.append(current.strip())
-    return segments
+    bounds = [0] + cuts + [len(parts)]
+    return ["\n\n".join(parts[start:end]) for start, end in zip(bounds, bounds[1:]) if end > start]
 
 
 def segment_markdown_structured(text, max_tokens=1024):
     """Prefer heading-aware chunking for markdown-like docs."""
-    heading_re = re.compile(r"^\s*(#{1,6}\s+\S+|第[一二三四五六七八九十\d]+[章节部分])")
-    units = []
-    buf = []
-
-    for line in text.splitlines():
-        if heading_re.match(line) and buf:
-            units.append("\n".join(buf).strip())
-            buf = [line]
-        else:
-            buf.append(line)
-
-    if buf:
-        units.append("\n".join(buf).strip())
-
-    if not units:
-        units = [p for p in text.split("\n\n") if p.strip()]
+    # Cut the text at every heading line start found in one regex pass
+    cuts = [m.start() for m in _HEADING_RE.finditer(text) if m.start() > 0]
+    bounds = [0] + cuts + [len(text)]
+    units = [text[start:end].strip() for start, end in zip(bounds, bounds[1:])]
 
     return _pack_units(units, _max_chars(max_tokens))
 
 
 def segment_code_aware(text, max_tokens=1024):
     """Keep fenced code blocks intact, chunk prose around them."""
-    parts = re.split(r"(```[\s\S]*?```)", text)
+    parts = _FENCE_RE.split(text)
     units = []
 
     for part in parts:
@@ -186,7 +233,7 @@ def segment_code_aware(text, max_tokens=1024):
         if chunk.startswith("```") and chunk.endswith("```"):
             units.append(chunk)
         else:
-            units.extend([p.strip() for p in re.split(r"\n{2,}", chunk) if p.strip()])
+            units.extend([p.strip() for p in _BLANK_RE.split(chunk) if p.strip()])
 
     return _pack_units(units, _max_chars(max_tokens))
 
@@ -199,23 +246,17 @@ def segment_fixed_length(text, max_tokens=1024, overlap_ratio=0.12):
 
     max_chars = _max_chars(max_tokens)
     step = max(200, int(max_chars * (1 - overlap_ratio)))
-    segments = []
-    start = 0
-
-    while start < len(content):
-        piece = content[start:start + max_chars].strip()
-        if piece:
-            segments.append(piece)
-        if start + max_chars >= len(content):
-            break
-        start += step
+    total = len(content)
 
-    return segments
+    # The last window is the first one that reaches the end of the text
+    last_start = -(-max(0, total - max_chars) // step) * step
+    starts = range(0, min(last_start + 1, total), step)
+    pieces = [content[start:start + max_chars].strip() for start in starts]
+    return [piece for piece in pieces if piece]
 
 
 def segment_with_strategy(text, ext, max_tokens=1024):
-    ext = ext.lower()
-
+    """Pick a segmenter by extension; `ext` must already be lower-cased."""
     if ext in MARKDOWN_EXTS:
         strategy = "markdown_recursive"
         segments = segment_markdown_structured(text, max_tokens=max_tokens)
@@ -251,16 +292,31 @@ def read_docx(path):
 
 
 def read_pdf(path):
-    """Extract text from a .pdf file."""
+    """Extract text from a .pdf file.
+
+    Prefers pypdfium2 (PDFium C++ backend); falls back to pure-Python PyPDF2.
+    """
     try:
-        import PyPDF2
         text_parts = []
-        with open(path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            import PyPDF2
+            with open(path, "rb") as f:
+                reader = PyPDF2.PdfReader(f)
+                for page in reader.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_parts.append(page_text)
+        else:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                for page in pdf:
+                    page_text = page.get_textpage().get_text_range()
+                    if page_text:
+                        text_parts.append(page_text.replace("\r\n", "\n"))
+            finally:
+                pdf.close()
         return "\n\n".join(text_parts) if text_parts else None
     except ImportError:
         emit("warning", message=t("clean.pdf_not_installed", filename=os.path.basename(path)))
@@ -270,49 +326,70 @@ def read_pdf(path):
         return None
 
 
-def clean_file(input_path, privacy_filter=False, fuzzy_dedup=False, fuzzy_threshold=0.85):
-    """Clean a single file and return cleaned segments."""
+def clean_paragraphs(input_path, privacy_filter=False, fuzzy_dedup=False, fuzzy_threshold=0.85, near_dedup=False):
+    """Read and clean a single file down to its unique, non-short paragraphs.
+
+    Returns (paragraphs, stats). The file is read exactly once; stats holds
+    raw_chars / removed_dupes / removed_short for the summary event.
+    """
     ext = os.path.splitext(input_path)[1].lower()
+    stats = {"raw_chars": 0, "removed_dupes": 0, "removed_short": 0}
 
     # Handle docx/pdf via dedicated readers
     if ext == ".docx":
         text = read_docx(input_path)
-        if text is None:
-            return []
     elif ext == ".pdf":
         text = read_pdf(input_path)
-        if text is None:
-            return []
     else:
-        # Plain text with encoding detection
-        encodings = ["utf-8", "gbk", "gb2312", "gb18030", "big5", "latin-1"]
-        text = None
-        for enc in encodings:
-            try:
-                with open(input_path, "r", encoding=enc) as f:
-                    text = f.read()
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+        with open(input_path, "rb") as f:
+            text = decode_text(f.read())
+        if text is not None:
+            # Same universal-newline handling as a text-mode read
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
 
     if text is None:
-        return []
+        return [], stats
+
+    stats["raw_chars"] = len(text)
 
     text = fix_encoding(text)
-    text = remove_noise(text)
+    text = remove_noise(text, ext)
     if privacy_filter:
         text = apply_privacy_filter(text)
 
-    paragraphs = text.split("\n\n")
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    before_dedup = len(paragraphs)
     paragraphs = dedup_paragraphs(paragraphs)
+    if near_dedup:
+        paragraphs = near_dedup_paragraphs(paragraphs)
     if fuzzy_dedup:
         paragraphs = fuzzy_dedup_paragraphs(paragraphs, threshold=fuzzy_threshold)
+    stats["removed_dupes"] = before_dedup - len(paragraphs)
+    before_filter = len(paragraphs)
     paragraphs = filter_short(paragraphs, min_chars=20)
+    stats["removed_short"] = before_filter - len(paragraphs)
+
+    return paragraphs, stats
+
+
+def clean_file(input_path, **options):
+    """Worker entry point: clean_paragraphs plus the events it emitted.
 
+    Workers must not write to the shared stdout pipe themselves; the parent
+    emits the returned (event_type, kwargs) pairs when it writes the file.
+    """
+    with captured_events() as events:
+        result = clean_paragraphs(input_path, **options)
+    return result, events
+
+
+def segment_paragraphs(paragraphs, input_path):
+    """Segment one file's cleaned paragraphs into segment records."""
     if not paragraphs:
         return []
 
     # Rejoin and segment with strategy auto-match
+    ext = os.path.splitext(input_path)[1].lower()
     cleaned_text = "\n\n".join(paragraphs)
     strategy, segments = segment_with_strategy(cleaned_text, ext, max_tokens=1024)
 
@@ -337,10 +414,19 @@ def main():
     parser.add_argument("--privacy-filter", action="store_true", help="Enable PII masking")
     parser.add_argument("--fuzzy-dedup", action="store_true", help="Enable fuzzy near-duplicate removal")
     parser.add_argument("--fuzzy-threshold", type=float, default=0.85, help="Fuzzy dedup threshold (0.5-1.0)")
+    parser.add_argument("--near-dedup", action="store_true", help="Enable MinHash-LSH near-duplicate removal (needs datasketch)")
     add_lang_arg(parser)
     args = parser.parse_args()
 
     init_i18n(args.lang)
+    batch_events()
+
+    if args.near_dedup:
+        try:
+            import datasketch  # noqa: F401
+        except ImportError:
+            emit("warning", message=t("clean.near_dedup_not_installed"))
+            args.near_dedup = False
 
     raw_dir = os.path.join(args.project_dir, "raw")
     cleaned_dir = os.path.join(args.project_dir, "cleaned")
@@ -350,10 +436,12 @@ def main():
         emit("error", message=t("clean.raw_not_found", path=raw_dir))
         sys.exit(1)
 
-    files = sorted([f for f in os.listdir(raw_dir) if os.path.isfile(os.path.join(raw_dir, f))])
-    if not files:
+    with os.scandir(raw_dir) as it:
+        entries = sorted((e for e in it if e.is_file()), key=lambda e: e.name)
+    if not entries:
         emit("error", message=t("clean.no_files"))
         sys.exit(1)
+    files = [e.name for e in entries]
 
     total_files = len(files)
     total_raw_chars = 0
@@ -364,16 +452,13 @@ def main():
 
     emit("progress", step=0, total=total_files, desc=t("clean.starting", count=total_files))
 
-    all_segments = []
     raw_manifest = []
-
-    for i, filename in enumerate(files):
-        input_path = os.path.join(raw_dir, filename)
+    for entry in entries:
         try:
-            stat_info = os.stat(input_path)
+            stat_info = entry.stat()
             raw_manifest.append(
                 {
-                    "name": filename,
+                    "name": entry.name,
                     "size_bytes": int(stat_info.st_size),
                     "modified_ts": int(stat_info.st_mtime),
                 }
@@ -381,67 +466,106 @@ def main():
         except OSError:
             raw_manifest.append(
                 {
-                    "name": filename,
+                    "name": entry.name,
                     "size_bytes": 0,
                     "modified_ts": 0,
                 }
             )
 
-        # Read raw for stats (use extracted text for binary docs)
-        try:
-            file_ext = os.path.splitext(input_path)[1].lower()
-            if file_ext == ".pdf":
-                raw_text = read_pdf(input_path) or ""
-            elif file_ext == ".docx":
-                raw_text = read_docx(input_path) or ""
-            else:
-                with open(input_path, "r", encoding="utf-8", errors="replace") as f:
-                    raw_text = f.read()
-            total_raw_chars += len(raw_text)
-
-            raw_paras = raw_text.split("\n\n")
-            segments = clean_file(
-                input_path,
-                privacy_filter=args.privacy_filter,
-                fuzzy_dedup=args.fuzzy_dedup,
-                fuzzy_threshold=max(0.5, min(1.0, args.fuzzy_threshold)),
-            )
-
-            cleaned_chars = sum(len(s["text"]) for s in segments)
-            total_cleaned_chars += cleaned_chars
-            total_segments += len(segments)
-            removed_dupes += max(0, len(raw_paras) - len(set(p.strip() for p in raw_paras if p.strip())))
-            removed_short += len([p for p in raw_paras if 0 < len(p.strip()) < 20])
-
-            all_segments.extend(segments)
-
-        except Exception as e:
-            emit("warning", message=t("clean.error_file", filename=filename, error=str(e)))
-            continue
-
-        emit("progress", step=i + 1, total=total_files, desc=t("clean.cleaned", filename=filename, segments=len(segments)))
-
-    # Write cleaned output as single file
+    # Segments are streamed to disk as files finish instead of being held
+    # for the whole corpus. Files are independent, so they are cleaned
+    # across all cores, a bounded window at a time; finished files wait in
+    # `pending` only until every earlier file is written, which keeps output
+    # order stable across runs.
+    # Paragraphs already kept from an earlier file (shared headers, footers,
+    # boilerplate) are dropped at that point, before segmentation. Only the
+    # 64-bit string hash is remembered, not the paragraph text.
     output_path = os.path.join(cleaned_dir, "cleaned_all.txt")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n\n---\n\n".join(seg["text"] for seg in all_segments))
-
-    # Also write individual segments for dataset generation
     segments_path = os.path.join(cleaned_dir, "segments.jsonl")
-    with open(segments_path, "w", encoding="utf-8") as f:
-        for idx, seg in enumerate(all_segments):
-            f.write(
-                json.dumps(
-                    {
-                        "id": idx,
-                        "text": seg["text"],
-                        "strategy": seg.get("strategy", "paragraph_balanced"),
-                        "source_file": seg.get("source_file", ""),
-                    },
-                    ensure_ascii=False,
-                )
-                + "\n"
-            )
+    pending = {}
+    next_to_write = 0
+    seg_id = 0
+    seen_paragraphs = set()
+
+    workers = max(1, min(os.cpu_count() or 1, total_files))
+    window = 2 * workers
+    with open(output_path, "w", encoding="utf-8") as cleaned_f, \
+            open(segments_path, "wb") as segments_f, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_i18n, initargs=(args.lang,)) as executor:
+        options = {
+            "privacy_filter": args.privacy_filter,
+            "fuzzy_dedup": args.fuzzy_dedup,
+            "fuzzy_threshold": max(0.5, min(1.0, args.fuzzy_threshold)),
+            "near_dedup": args.near_dedup,
+        }
+        futures = {}
+        not_done = set()
+        next_to_submit = 0
+        while next_to_write < total_files:
+            # Only files within `window` of the write position are submitted,
+            # so one slow early file can't make `pending` hold the corpus.
+            while next_to_submit < min(total_files, next_to_write + window):
+                future = executor.submit(clean_file, entries[next_to_submit].path, **options)
+                futures[future] = next_to_submit
+                not_done.add(future)
+                next_to_submit += 1
+            finished, not_done = wait(not_done, timeout=FLUSH_INTERVAL, return_when=FIRST_COMPLETED)
+            if not finished:
+                # A slow file is still running; don't hold earlier progress back
+                flush_events()
+                continue
+            for future in finished:
+                i = futures.pop(future)
+                try:
+                    pending[i] = future.result()
+                except Exception as e:
+                    emit("warning", message=t("clean.error_file", filename=files[i], error=str(e)))
+                    pending[i] = None
+
+            while next_to_write in pending:
+                result = pending.pop(next_to_write)
+                entry = entries[next_to_write]
+                next_to_write += 1
+                if result is None:
+                    continue
+                (paragraphs, stats), worker_events = result
+                for event_type, kwargs in worker_events:
+                    emit(event_type, **kwargs)
+
+                kept = []
+                for para in paragraphs:
+                    key = hash(para.strip())
+                    if key in seen_paragraphs:
+                        stats["removed_dupes"] += 1
+                        continue
+                    seen_paragraphs.add(key)
+                    kept.append(para)
+                segments = segment_paragraphs(kept, entry.path)
+
+                total_raw_chars += stats["raw_chars"]
+                total_cleaned_chars += sum(len(s["text"]) for s in segments)
+                total_segments += len(segments)
+                removed_dupes += stats["removed_dupes"]
+                removed_short += stats["removed_short"]
+
+                for seg in segments:
+                    if seg_id:
+                        cleaned_f.write("\n\n---\n\n")
+                    cleaned_f.write(seg["text"])
+                    segments_f.write(
+                        json_bytes(
+                            {
+                                "id": seg_id,
+                                "text": seg["text"],
+                                "strategy": seg.get("strategy", "paragraph_balanced"),
+                                "source_file": seg.get("source_file", ""),
+                            }
+                        )
+                    )
+                    segments_f.write(b"\n")
+                    seg_id += 1
+
+                emit("progress", step=next_to_write, total=total_files, desc=t("clean.cleaned", filename=entry.name, segments=len(segments)))
 
     manifest_path = os.path.join(cleaned_dir, "segments_manifest.json")
     with open(manifest_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,84 @@
+"""Subprocess helpers shared by the Courtyard export scripts.
+
+stream_cli runs a CLI tool (mlx_lm, ollama, ...) and hands each cleaned-up
+output line to a callback, typically one that emits a progress event:
+
+    from cli_utils import stream_cli
+    ok, _, output = stream_cli(cmd, lambda line: emit("progress", step="fuse", desc=line))
+"""
+
+import re
+import subprocess
+import threading
+from collections import deque
+
+# Lines kept for the error message returned by stream_cli.
+OUTPUT_TAIL_LINES = 50
+
+_ANSI_RE = re.compile(r'(\x9B|\x1B\[)[0-9;?]*[ -/]*[@-~]|\x1B[^\[\]]*[\\\]]?')
+# Braille spinner glyphs (⠋⠙⠹...) that ollama prefixes to redrawn status lines.
+_SPINNER_RE = re.compile(r'[⠀-⣿]')
+
+
+def strip_ansi(text):
+    """Strip ANSI escape codes and terminal control sequences."""
+    return _ANSI_RE.sub('', text or '')
+
+
+def stream_cli(cmd, on_line, timeout=600, input_text=None):
+    """Run cmd, passing each new output line to on_line.
+
+    stdout and stderr are merged; only the last lines are kept (returned in
+    the stderr slot) so memory stays flat however chatty the tool is.
+    input_text, if given, is written to the command's stdin.
+    Returns (ok, "", output_tail).
+    """
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input_text is not None else None,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+        )
+    except FileNotFoundError as e:
+        return False, "", str(e)
+
+    if input_text is not None:
+        try:
+            proc.stdin.write(input_text)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    # readline() blocks while the tool is silent, so enforce the deadline
+    # from a timer instead of checking it per line.
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        proc.kill()
+
+    watchdog = threading.Timer(timeout, _kill)
+    watchdog.start()
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    try:
+        for line in proc.stdout:
+            # Spinners redraw the same status line (\r-separated) with a new
+            # glyph each frame; without the glyph the frames are identical.
+            line = _SPINNER_RE.sub('', strip_ansi(line)).strip()
+            if not line or (tail and tail[-1] == line):
+                continue
+            tail.append(line)
+            on_line(line)
+        proc.wait()
+    finally:
+        watchdog.cancel()
+        # Only still running if on_line raised; don't leave it orphaned.
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    if timed_out.is_set():
+        limit = f"{timeout // 60} minutes" if timeout >= 60 else f"{timeout} seconds"
+        return False, "", f"Command timed out after {limit}"
+    return proc.returncode == 0, "", "\n".join(tail)
@@ -13,17 +13,28 @@ Output format (one JSON line per event, parsed by Rust backend):
 """
 
 import sys
-import json
 import time
 import os
 import argparse
+import importlib.util
+import threading
 
+from events import write_event as emit
 from i18n import t, init_i18n, add_lang_arg
 
 
-def emit(event_data: dict):
-    """Print a JSON event line for Rust to parse."""
-    print(json.dumps(event_data, ensure_ascii=False), flush=True)
+def _compute_total_size(api, repo_id, total_size):
+    """Sum repo file sizes and report them; runs alongside the download."""
+    try:
+        files = api.list_repo_tree(repo_id, recursive=True)
+        total = 0
+        for f in files:
+            if hasattr(f, "size") and f.size:
+                total += f.size
+        total_size[0] = total
+        emit({"event": "total_size", "bytes": total, "mb": round(total / (1024 * 1024), 1)})
+    except Exception:
+        pass  # Non-critical, progress will work without total
 
 
 def main():
@@ -40,6 +51,12 @@ def main():
 
     emit({"event": "start", "repo_id": repo_id})
 
+    # Rust-backed parallel transfer for large shards. huggingface_hub reads
+    # this flag at import time and errors if it is set without hf_transfer,
+    # so only enable it when the package is actually installed.
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
     try:
         from huggingface_hub import snapshot_download, HfApi
         from huggingface_hub.utils import (
@@ -100,21 +117,14 @@ def main():
                 })
                 last_report_time[0] = now
 
-    # Calculate total size first
-    try:
-        files = api.list_repo_tree(repo_id, recursive=True)
-        total = 0
-        for f in files:
-            if hasattr(f, "size") and f.size:
-                total += f.size
-        total_size[0] = total
-        emit({"event": "total_size", "bytes": total, "mb": round(total / (1024 * 1024), 1)})
-    except Exception:
-        pass  # Non-critical, progress will work without total
+    # Calculate total size concurrently so the download starts right away
+    threading.Thread(
+        target=_compute_total_size, args=(api, repo_id, total_size), daemon=True
+    ).start()
 
     # Download
     try:
-        kwargs = {"repo_id": repo_id, "local_dir_use_symlinks": False}
+        kwargs = {"repo_id": repo_id, "local_dir_use_symlinks": False, "max_workers": 8}
         if cache_dir:
             kwargs["cache_dir"] = cache_dir
 
@@ -0,0 +1,133 @@
+"""JSON helpers and the stdout event channel shared by Courtyard Python scripts.
+
+Every script talks to the Rust side through JSON lines on stdout:
+
+    from events import batch_events, emit, flush_events
+    emit("progress", step=1, total=10, desc="...")   # flushed at once
+    emit("complete", total=10)
+
+    batch_events()                                   # high-volume scripts: flush every 0.25 s,
+    flush_events()                                   # and before blocking for a while
+
+The JSON helpers use orjson when it is installed and fall back to the
+standard library; json_bytes produces the same compact, non-ASCII-escaped
+output either way.
+"""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON from bytes/str, trying orjson first.
+
+    Anything orjson rejects (NaN, lone surrogates, ...) is handed to
+    json.loads, so callers keep catching json.JSONDecodeError as before.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+_fast_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_loads_fast(data):
+    """Parse JSON with a single parser: orjson when available, else json.loads.
+
+    For hot paths over text that is often malformed (model output), where
+    json_loads would parse every rejected input a second time. NaN/Infinity
+    and lone surrogates are rejected when orjson is installed. Failures raise
+    json.JSONDecodeError (orjson.JSONDecodeError subclasses it).
+    """
+    return _fast_loads(data)
+
+
+def json_bytes(obj, indent=False):
+    """Serialize to UTF-8 JSON (compact, or 2-space indented), using orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except orjson.JSONEncodeError:
+            pass
+    layout = {"indent": 2} if indent else {"separators": (",", ":")}
+    try:
+        return json.dumps(obj, ensure_ascii=False, **layout).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates cannot be UTF-8 encoded; keep them as \u escapes.
+        return json.dumps(obj, **layout).encode("utf-8")
+
+
+# Scripts that emit many progress lines call batch_events() so those lines are
+# flushed at most every FLUSH_INTERVAL seconds; errors, warnings and completion
+# always go out at once. Without it every line is flushed as it is written.
+FLUSH_INTERVAL = 0.25
+_URGENT_EVENTS = frozenset({"error", "warning", "complete"})
+_batching = [False]
+_last_flush = [time.monotonic()]
+# Reentrant: a signal handler may flush while the main thread is writing.
+_write_lock = threading.RLock()
+# Set inside captured_events(); emit() appends to it instead of writing.
+_captured = [None]
+
+
+def batch_events(enabled=True):
+    """Throttle flushing of non-urgent events to every FLUSH_INTERVAL seconds."""
+    _batching[0] = enabled
+
+
+def flush_events():
+    """Push any buffered event lines through to the Rust side."""
+    with _write_lock:
+        sys.stdout.buffer.flush()
+        _last_flush[0] = time.monotonic()
+
+
+def write_event(payload, flush=True):
+    """Write one JSON line to stdout; safe to call from several threads."""
+    line = json_bytes(payload) + b"\n"
+    with _write_lock:
+        sys.stdout.buffer.write(line)
+        if flush:
+            sys.stdout.buffer.flush()
+            _last_flush[0] = time.monotonic()
+
+
+def emit(event_type, **kwargs):
+    """Emit a JSON event line to stdout for Rust to parse."""
+    if _captured[0] is not None:
+        _captured[0].append((event_type, kwargs))
+        return
+    flush = (
+        not _batching[0]
+        or event_type in _URGENT_EVENTS
+        or time.monotonic() - _last_flush[0] >= FLUSH_INTERVAL
+    )
+    write_event({"type": event_type, **kwargs}, flush=flush)
+
+
+@contextlib.contextmanager
+def captured_events():
+    """Collect emit() calls as (event_type, kwargs) pairs instead of writing them.
+
+    Worker processes share the parent's stdout pipe, and writes larger than
+    PIPE_BUF are not atomic, so a worker line could land in the middle of the
+    parent's batch. Workers return the collected events for the parent to emit.
+    """
+    collected = []
+    previous, _captured[0] = _captured[0], collected
+    try:
+        yield collected
+    finally:
+        _captured[0] = previous
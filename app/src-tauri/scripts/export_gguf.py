@@ -7,28 +7,16 @@ The output .gguf file can be used directly with llama.cpp, LM Studio, Jan, etc.
 Output: JSON lines to stdout (progress + complete/error events)
 """
 import argparse
-import glob
-import json
 import os
-import subprocess
 import sys
 
+from cli_utils import stream_cli
+from events import emit
 from i18n import t, init_i18n, add_lang_arg
 
 
-def emit(event_type, **kwargs):
-    payload = {"type": event_type, **kwargs}
-    print(json.dumps(payload, ensure_ascii=False), flush=True)
-
-
-def run_cli(cmd, timeout=900):
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-        return result.returncode == 0, result.stdout.strip(), result.stderr.strip()
-    except subprocess.TimeoutExpired:
-        return False, "", "Command timed out after 15 minutes"
-    except FileNotFoundError as e:
-        return False, "", str(e)
+def _fuse_progress(line):
+    emit("progress", step="fuse", desc=line)
 
 
 def resolve_model_path(model_id):
@@ -48,13 +36,11 @@ def resolve_model_path(model_id):
 
 
 def find_gguf(directory):
-    for pat in [
-        os.path.join(directory, "*.gguf"),
-        os.path.join(directory, "**", "*.gguf"),
-    ]:
-        files = glob.glob(pat, recursive=True)
-        if files:
-            return files[0]
+    # Top-down walk: files directly in `directory` are checked first.
+    for root, _dirs, files in os.walk(directory):
+        for fn in files:
+            if fn.endswith(".gguf"):
+                return os.path.join(root, fn)
     return None
 
 
@@ -112,7 +98,7 @@ def _run(args):
         "--export-gguf",
         "--dequantize",
     ]
-    ok, _stdout, stderr = run_cli(cmd, timeout=900)
+    ok, _stdout, stderr = stream_cli(cmd, _fuse_progress, timeout=900)
 
     if not ok:
         # Detect upstream architecture limitation and emit a friendly message
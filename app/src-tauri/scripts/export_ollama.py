@@ -16,24 +16,33 @@ Input:  --model <id> --adapter-path <path> --model-name <name> --quantization <q
 Output: JSON lines to stdout (progress + completion)
 """
 import argparse
+import functools
 import glob
 import json
+import mmap
 import os
 import shutil
 import re
 import struct
 import subprocess
 import sys
-import tempfile
+import threading
+from collections import deque
 
+from cli_utils import stream_cli, strip_ansi
+from events import emit, json_bytes, json_loads
 from i18n import t, init_i18n, add_lang_arg
 
 # Ollama-compatible safetensors dtypes (from reader_safetensors.go)
-OLLAMA_OK_DTYPES = {"F32", "F16", "BF16", "U8"}
+OLLAMA_OK_DTYPES = frozenset({"F32", "F16", "BF16", "U8"})
 
 # Resolved ollama binary path (set in main before _run)
 _OLLAMA_BIN = "ollama"
 
+# Whether `ollama create` can read the Modelfile from /dev/stdin; cleared on
+# the first rejection so later calls go straight to a temp file.
+_MODELFILE_VIA_STDIN = True
+
 
 def resolve_ollama_bin(hint=""):
     """Resolve the full path to the ollama binary.
@@ -55,25 +64,9 @@ def resolve_ollama_bin(hint=""):
     return "ollama"
 
 
-def emit(event_type, **kwargs):
-    payload = {"type": event_type, **kwargs}
-    print(json.dumps(payload, ensure_ascii=False), flush=True)
-
-
 def check_ollama():
     """Check if Ollama is installed and running."""
-    try:
-        result = subprocess.run(
-            [_OLLAMA_BIN, "list"], capture_output=True, text=True, timeout=10
-        )
-        return result.returncode == 0
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return False
-
-
-def _strip_ansi(text):
-    """Strip ANSI escape codes and terminal control sequences."""
-    return re.sub(r'(\x9B|\x1B\[)[0-9;?]*[ -/]*[@-~]|\x1B[^\[\]]*[\\\]]?', '', text or '')
+    return run_cli_status([_OLLAMA_BIN, "list"], timeout=10)
 
 
 def _read_model_arch(model_dir):
@@ -92,7 +85,7 @@ def _read_model_arch(model_dir):
 
 def _interpret_ollama_stderr(stderr):
     """Translate raw ollama create stderr into a user-friendly message."""
-    clean = _strip_ansi(stderr or '').strip()
+    clean = strip_ansi(stderr).strip()
     m = re.search(r'unsupported architecture\s*["\']?([\w]+)["\']?', clean, re.IGNORECASE)
     if m:
         return t("export.ollama_error_unsupported_arch", arch=m.group(1))
@@ -102,6 +95,7 @@ def _interpret_ollama_stderr(stderr):
     return clean[-400:] if clean else ''
 
 
+@functools.lru_cache(maxsize=32)
 def resolve_model_path(model_id):
     """Resolve HuggingFace model ID to local cache path if available."""
     if model_id.startswith(("/", "~", ".")):
@@ -112,33 +106,45 @@ def resolve_model_path(model_id):
     model_cache = os.path.join(cache_dir, safe_name)
     if os.path.isdir(model_cache):
         snapshots = os.path.join(model_cache, "snapshots")
-        if os.path.isdir(snapshots):
-            versions = sorted(os.listdir(snapshots))
-            if versions:
-                return os.path.join(snapshots, versions[-1])
+        try:
+            with os.scandir(snapshots) as it:
+                latest = max((e.name for e in it if e.is_dir()), default=None)
+        except OSError:
+            latest = None
+        if latest:
+            return os.path.join(snapshots, latest)
     return model_id
 
 
-def run_cli(cmd, timeout=600):
-    """Run a CLI command, return (success, stdout, stderr)."""
+def run_cli_status(cmd, timeout=600):
+    """Run a CLI command whose output is not needed; return success only."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-        return result.returncode == 0, result.stdout.strip(), result.stderr.strip()
-    except subprocess.TimeoutExpired:
-        return False, "", "Command timed out"
-    except FileNotFoundError as e:
-        return False, "", str(e)
-
-
-def _find_gguf(directory):
-    """Find .gguf files in a directory."""
-    for pat in [
-        os.path.join(directory, "*.gguf"),
-        os.path.join(directory, "**", "*.gguf"),
-    ]:
-        files = glob.glob(pat, recursive=True)
-        if files:
-            return files[0]
+        result = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout
+        )
+        return result.returncode == 0
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
+
+
+def _ollama_progress(line):
+    emit("progress", step="ollama", desc=line)
+
+
+def _find_gguf(directory, max_depth=4):
+    """Find a .gguf file in a directory (breadth-first, shallowest wins)."""
+    queue = deque([(directory, 0)])
+    while queue:
+        current, depth = queue.popleft()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.endswith(".gguf") and entry.is_file():
+                        return entry.path
+                    if depth < max_depth and entry.is_dir(follow_symlinks=False):
+                        queue.append((entry.path, depth + 1))
+        except OSError:
+            continue
     return None
 
 
@@ -165,8 +171,8 @@ def fuse_and_dequantize_direct(model_path, adapter_path, output_path):
     except TypeError:
         model, tokenizer = load(model_path, adapter_path=adapter_path)
         config_file = os.path.join(model_path, "config.json")
-        with open(config_file, "r") as f:
-            config = json.load(f)
+        with open(config_file, "rb") as f:
+            config = json_loads(f.read())
 
     # Fuse LoRA layers (with per-layer dequantize)
     emit("progress", step="fuse", desc=t("export.fusing_lora"))
@@ -182,8 +188,11 @@ def fuse_and_dequantize_direct(model_path, adapter_path, output_path):
     # Dequantize ALL remaining quantized layers
     emit("progress", step="fuse", desc=t("export.dequantizing"))
     model = dequantize_model(model)
+    # Strip every MLX quantization field here so save() writes the final
+    # Ollama-ready config.json; no second read/rewrite pass is needed.
     config.pop("quantization", None)
     config.pop("quantization_config", None)
+    config.pop("quantize", None)
 
     # Ensure 'architectures' field is present (Ollama needs it to detect model type)
     if "architectures" not in config:
@@ -213,6 +222,100 @@ def fuse_and_dequantize_direct(model_path, adapter_path, output_path):
 # ---------------------------------------------------------------------------
 # Binary-level safetensors cleaner (safety net)
 # ---------------------------------------------------------------------------
+def _read_safetensors_header(fpath):
+    """Parse only the JSON header of a safetensors file.
+
+    Returns (header, data_start) where data_start is the absolute offset of
+    the tensor data block.
+    """
+    with open(fpath, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json_loads(f.read(header_size))
+    return header, 8 + header_size
+
+
+def verify_safetensors_dtypes(model_dir):
+    """Header-only check of every safetensors file in model_dir.
+
+    Returns (bad_dtypes, tensor_count, duplicate_count): the set of dtypes
+    Ollama cannot read, the number of tensors, and how many of them repeat a
+    name already seen in another file. The model is compatible as-is only
+    when bad_dtypes is empty and duplicate_count is 0.
+    """
+    ok_dtypes = OLLAMA_OK_DTYPES
+    bad_dtypes = set()
+    tensor_count = 0
+    names = set()
+    with os.scandir(model_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".safetensors") or not entry.is_file():
+                continue
+            header, _ = _read_safetensors_header(entry.path)
+            header.pop("__metadata__", None)
+            tensor_count += len(header)
+            names.update(header)
+            for meta in header.values():
+                dtype = meta.get("dtype", "")
+                if dtype not in ok_dtypes:
+                    bad_dtypes.add(dtype)
+    return bad_dtypes, tensor_count, tensor_count - len(names)
+
+
+def _rewrite_safetensors(fpath, hdr_bytes, copy_ranges):
+    """Rebuild a shard with a new header and the given data byte ranges.
+
+    Kept tensors are written straight from a read-only mapping of the shard
+    into a sibling file, which is then swapped in atomically; the original
+    shard stays intact until the replacement is complete.
+    """
+    tmp_path = fpath + ".tmp"
+    try:
+        with open(fpath, "rb") as src, \
+                mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                open(tmp_path, "wb") as dst:
+            # Read-ahead hints for the one sequential pass over the source;
+            # both are optional (macOS has madvise but no posix_fadvise).
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            dst.write(struct.pack("<Q", len(hdr_bytes)))
+            dst.write(hdr_bytes)
+            with memoryview(mm) as view:
+                for offset, length in copy_ranges:
+                    dst.write(view[offset:offset + length])
+        os.replace(tmp_path, fpath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _fsync_dir(path):
+    """Persist renames/unlinks in a directory (no-op where unsupported)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _reset_dir(path):
+    """Remove path (if present) and recreate it empty."""
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
 def clean_safetensors_for_ollama(model_dir):
     """Remove ALL non-float tensors from safetensors files.
 
@@ -222,77 +325,65 @@ def clean_safetensors_for_ollama(model_dir):
 
     Returns (kept_count, removed_count).
     """
-    # If a consolidated model.safetensors exists, stale shard files from older
-    # export attempts must be removed, otherwise Ollama import may see duplicate
-    # tensor names when converting to GGUF.
-    merged_file = os.path.join(model_dir, "model.safetensors")
-    shard_files = sorted(glob.glob(os.path.join(model_dir, "model-*-of-*.safetensors")))
-    if os.path.isfile(merged_file) and shard_files:
-        for fp in shard_files:
-            try:
-                os.remove(fp)
-            except OSError:
-                pass
-        shard_index = os.path.join(model_dir, "model.safetensors.index.json")
-        if os.path.isfile(shard_index):
-            try:
-                os.remove(shard_index)
-            except OSError:
-                pass
-
+    # mlx_lm's save_model writes either model.safetensors or
+    # model-XXXXX-of-YYYYY shards, never both, and _run empties fused_dir
+    # before every save (including the one after a failed GGUF attempt), so
+    # there is no merged-vs-shard mix to reconcile.
     st_files = sorted(glob.glob(os.path.join(model_dir, "*.safetensors")))
     if not st_files:
         return 0, 0
 
+    ok_dtypes = OLLAMA_OK_DTYPES
     total_removed = 0
     total_kept = 0
     seen_tensor_names = set()
+    rewrites = []
+    dir_changed = False
 
+    # Header-only pass in shard order: decides which tensors survive (dtype
+    # filter and cross-shard dedup) without touching any tensor payloads.
     for fpath in st_files:
-        with open(fpath, "rb") as f:
-            raw = f.read()
-
-        header_size = struct.unpack("<Q", raw[:8])[0]
-        header_json = raw[8 : 8 + header_size]
-        data_start = 8 + header_size
-        header = json.loads(header_json)
+        # Only the header is parsed; tensor payloads are never loaded whole.
+        header, data_start = _read_safetensors_header(fpath)
 
         metadata = header.pop("__metadata__", None)
 
-        # Identify tensors with unsupported dtypes
-        to_remove = set()
-        for name, meta in header.items():
-            if meta.get("dtype", "") not in OLLAMA_OK_DTYPES:
-                to_remove.add(name)
-                continue
-            if name in seen_tensor_names:
-                to_remove.add(name)
-
-        if not to_remove:
-            total_kept += len(header)
-            seen_tensor_names.update(header.keys())
-            continue
-
-        # Rebuild file keeping only Ollama-compatible tensors
+        # Single pass in header order (json preserves it): drop tensors with
+        # unsupported dtypes or already seen in an earlier shard, and plan the
+        # rebuilt file from metadata alone.
         kept = {}
-        new_data = bytearray()
-        for name in sorted(header.keys()):
-            if name in to_remove:
-                total_removed += 1
+        copy_ranges = []
+        cursor = 0
+        for name, meta in header.items():
+            if meta.get("dtype", "") not in ok_dtypes or name in seen_tensor_names:
                 continue
-            meta = header[name]
             offsets = meta["data_offsets"]
-            chunk = raw[data_start + offsets[0] : data_start + offsets[1]]
-            start = len(new_data)
-            new_data.extend(chunk)
+            length = offsets[1] - offsets[0]
             kept[name] = {
                 "dtype": meta["dtype"],
                 "shape": meta["shape"],
-                "data_offsets": [start, len(new_data)],
+                "data_offsets": [cursor, cursor + length],
             }
-            total_kept += 1
-            seen_tensor_names.add(name)
+            src = data_start + offsets[0]
+            if copy_ranges and copy_ranges[-1][0] + copy_ranges[-1][1] == src:
+                # Contiguous with the previous kept tensor: extend that range
+                # so it goes out in one write.
+                copy_ranges[-1] = (copy_ranges[-1][0], copy_ranges[-1][1] + length)
+            else:
+                copy_ranges.append((src, length))
+            cursor += length
+
+        # __metadata__ was popped above, so header holds tensors only.
+        removed = len(header) - len(kept)
+        total_kept += len(kept)
+        total_removed += removed
+        seen_tensor_names.update(kept)
+
+        if not removed:
+            # Nothing to drop: leave the shard untouched.
+            continue
 
+        dir_changed = True
         if not kept:
             # This shard became empty after filtering unsupported/duplicate tensors.
             try:
@@ -303,37 +394,26 @@ def clean_safetensors_for_ollama(model_dir):
 
         if metadata is not None:
             kept["__metadata__"] = metadata
-        hdr_bytes = json.dumps(kept, ensure_ascii=False).encode("utf-8")
-
-        with open(fpath, "wb") as f:
-            f.write(struct.pack("<Q", len(hdr_bytes)))
-            f.write(hdr_bytes)
-            f.write(new_data)
-
-    return total_kept, total_removed
-
-
-def clean_config_for_ollama(model_dir):
-    """Remove MLX quantization config fields from config.json."""
-    config_path = os.path.join(model_dir, "config.json")
-    if not os.path.exists(config_path):
-        return False
+        hdr_bytes = json_bytes(kept)
+        rewrites.append((fpath, hdr_bytes, copy_ranges))
 
-    with open(config_path, "r") as f:
-        config = json.load(f)
+    # Shards are independent once the keep sets are fixed, so rewrite them
+    # concurrently when there is more than one.
+    if len(rewrites) > 1:
+        from concurrent.futures import ProcessPoolExecutor
 
-    keys_to_remove = ["quantization_config", "quantization", "quantize"]
-    changed = False
-    for key in keys_to_remove:
-        if key in config:
-            del config[key]
-            changed = True
+        workers = min(len(rewrites), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(_rewrite_safetensors, *zip(*rewrites)))
+    else:
+        for rewrite in rewrites:
+            _rewrite_safetensors(*rewrite)
 
-    if changed:
-        with open(config_path, "w") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+    # One directory sync for all swaps/removals instead of one per shard.
+    if dir_changed:
+        _fsync_dir(model_dir)
 
-    return changed
+    return total_kept, total_removed
 
 
 # ---------------------------------------------------------------------------
@@ -348,7 +428,7 @@ def try_gguf_export(model_path, adapter_path, output_path):
         "--save-path", output_path,
     ]
     emit("progress", step="fuse", desc=t("export.gguf_try"))
-    ok, _, _ = run_cli(base_cmd + ["--export-gguf", "--dequantize"])
+    ok = run_cli_status(base_cmd + ["--export-gguf", "--dequantize"])
     if ok:
         gguf = _find_gguf(output_path)
         if gguf:
@@ -370,28 +450,20 @@ def create_ollama_model(model_name, model_path, model_format, quantization="q4")
          desc=t("export.creating", name=model_name, format=fmt, quant=ollama_quant))
 
     # Remove any stale/broken model with the same name first
-    run_cli([_OLLAMA_BIN, "rm", model_name], timeout=30)
+    run_cli_status([_OLLAMA_BIN, "rm", model_name], timeout=30)
 
-    modelfile_content = f"FROM {model_path}\n"
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".Modelfile", delete=False) as f:
-        f.write(modelfile_content)
-        modelfile_path = f.name
+    modelfile_content = f"FROM {os.path.abspath(model_path)}\n"
+    quant_args = ["--quantize", ollama_quant] if ollama_quant != "f16" else []
 
     try:
-        cmd = [_OLLAMA_BIN, "create", model_name, "-f", modelfile_path]
-        if ollama_quant != "f16":
-            cmd.extend(["--quantize", ollama_quant])
-
-        emit("progress", step="ollama", desc=t("export.running_cmd", cmd=' '.join(cmd)))
-        ok, stdout, stderr = run_cli(cmd, timeout=600)
+        ok, stderr = _ollama_create(model_name, modelfile_content, quant_args)
         if ok:
             return True
 
         # If --quantize flag caused error, retry without it
-        if "--quantize" in " ".join(cmd):
+        if quant_args:
             emit("progress", step="ollama", desc=t("export.retry_no_quant"))
-            cmd_no_q = [_OLLAMA_BIN, "create", model_name, "-f", modelfile_path]
-            ok2, _, stderr2 = run_cli(cmd_no_q, timeout=600)
+            ok2, stderr2 = _ollama_create(model_name, modelfile_content, [])
             if ok2:
                 return True
             stderr = stderr2 or stderr
@@ -399,6 +471,32 @@ def create_ollama_model(model_name, model_path, model_format, quantization="q4")
         return False, stderr
     except Exception as e:
         return False, str(e)
+
+
+def _ollama_create(model_name, modelfile_content, extra_args):
+    """Run `ollama create` for the given Modelfile; return (success, output tail).
+
+    The Modelfile is piped through /dev/stdin. If this ollama cannot open it,
+    fall back (for the rest of the run) to a temporary Modelfile on disk.
+    """
+    global _MODELFILE_VIA_STDIN
+    if _MODELFILE_VIA_STDIN and os.path.exists("/dev/stdin"):
+        cmd = [_OLLAMA_BIN, "create", model_name, "-f", "/dev/stdin"] + extra_args
+        emit("progress", step="ollama", desc=t("export.running_cmd", cmd=' '.join(cmd)))
+        ok, _, output = stream_cli(cmd, _ollama_progress, timeout=600, input_text=modelfile_content)
+        if ok or "/dev/stdin" not in output:
+            return ok, output
+        _MODELFILE_VIA_STDIN = False
+
+    import tempfile
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".Modelfile", delete=False) as f:
+        f.write(modelfile_content)
+        modelfile_path = f.name
+    try:
+        cmd = [_OLLAMA_BIN, "create", model_name, "-f", modelfile_path] + extra_args
+        emit("progress", step="ollama", desc=t("export.running_cmd", cmd=' '.join(cmd)))
+        ok, _, output = stream_cli(cmd, _ollama_progress, timeout=600)
+        return ok, output
     finally:
         try:
             os.unlink(modelfile_path)
@@ -406,26 +504,122 @@ def create_ollama_model(model_name, model_path, model_format, quantization="q4")
             pass
 
 
+def _probe_ollama_run(proc, timeout):
+    """Wait for one `ollama run` probe; return (success, stdout, stderr)."""
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        return False, "", "Command timed out"
+    return proc.returncode == 0, (stdout or "").strip(), (stderr or "").strip()
+
+
+def _ollama_base_url():
+    """Base URL of the Ollama API, honouring OLLAMA_HOST like the ollama CLI does."""
+    host = os.environ.get("OLLAMA_HOST", "").strip().rstrip("/")
+    if not host:
+        return "http://127.0.0.1:11434"
+    scheme, sep, rest = host.partition("://")
+    if not sep:
+        scheme, rest = "http", host
+    hostname, colon, port = rest.rpartition(":")
+    if not colon or "]" in port:
+        hostname, port = rest, "443" if scheme == "https" else "11434"
+    # A server bound to every interface is reached through loopback.
+    if hostname in ("", "0.0.0.0", "[::]"):
+        hostname = "127.0.0.1"
+    return f"{scheme}://{hostname}:{port}"
+
+
+def _ollama_api(path, payload, timeout):
+    """POST a JSON payload to the Ollama API.
+
+    Returns (True, "") on success, (False, error) if the API rejects the
+    request, or (None, error) if the API is unreachable.
+    """
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(
+        _ollama_base_url() + path,
+        data=json_bytes(payload),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+        return True, ""
+    except urllib.error.HTTPError as e:
+        try:
+            detail = json_loads(e.read()).get("error", "")
+        except Exception:
+            detail = ""
+        return False, detail or f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError) as e:
+        return None, str(e)
+
+
 def verify_ollama_model_runtime(model_name):
-    """Run a short runtime smoke test to ensure the created model is loadable."""
+    """Ensure the created model is usable.
+
+    /api/show (metadata only) rejects a broken manifest cheaply; an empty
+    /api/generate request then loads the weights without generating, which
+    is what surfaces "unable to load model" errors. The `ollama run`
+    generation smoke test (both probe prompts at once; the first success
+    wins and the other probe is killed) runs only when the API is
+    unreachable or OLLAMA_STRICT_VERIFY=1 is set.
+    """
+    shown, error = _ollama_api("/api/show", {"model": model_name, "name": model_name}, timeout=10)
+    if shown is False:
+        return False, error
+    if shown:
+        # keep_alive must be non-zero: an empty prompt with 0 unloads instead.
+        loaded, error = _ollama_api(
+            "/api/generate",
+            {"model": model_name, "prompt": "", "keep_alive": "1m", "stream": False},
+            timeout=120,
+        )
+        if loaded is False:
+            return False, error
+        if loaded and os.environ.get("OLLAMA_STRICT_VERIFY") != "1":
+            return True, "(model loaded)"
+
     prompts = [
         "Reply with exactly one word: OK",
         "Say OK",
     ]
-    last_error = ""
+    procs = []
+    try:
+        for prompt in prompts:
+            procs.append(subprocess.Popen(
+                [_OLLAMA_BIN, "run", "--nowordwrap", model_name, prompt],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            ))
+    except FileNotFoundError as e:
+        for proc in procs:
+            proc.kill()
+        return False, str(e)
 
-    for prompt in prompts:
-        ok, stdout, stderr = run_cli(
-            [_OLLAMA_BIN, "run", "--nowordwrap", model_name, prompt], timeout=45
-        )
-        text = (stdout or "").strip()
-        if ok:
-            return True, text[:120] if text else "(model loaded; empty response)"
+    from concurrent.futures import ThreadPoolExecutor, as_completed
 
-        last_error = (stderr or stdout or "Model returned no output").strip()
-        # Load errors are deterministic; no need to keep retrying prompts.
-        if "unable to load model" in last_error.lower():
-            break
+    last_error = ""
+    with ThreadPoolExecutor(max_workers=len(procs)) as ex:
+        futures = [ex.submit(_probe_ollama_run, proc, 45) for proc in procs]
+        try:
+            for fut in as_completed(futures):
+                ok, text, stderr = fut.result()
+                if ok:
+                    return True, text[:120] if text else "(model loaded; empty response)"
+
+                last_error = (stderr or text or "Model returned no output").strip()
+                # Load errors are deterministic; no need to wait for the other probe.
+                if "unable to load model" in last_error.lower():
+                    break
+        finally:
+            for proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
 
     return False, last_error
 
@@ -464,6 +658,10 @@ def _run(args):
     # Step 1: signal start (Ollama availability already verified by the frontend)
     emit("progress", step="check", desc="Starting export pipeline")
 
+    # Touch the daemon in the background so it is warm (manifests indexed,
+    # runtime paged in) by the time `ollama create` runs after the fuse.
+    threading.Thread(target=check_ollama, daemon=True).start()
+
     # Step 2: Resolve paths
     resolved = resolve_model_path(args.model)
     if resolved is None:
@@ -478,10 +676,11 @@ def _run(args):
     if not os.path.isdir(args.adapter_path):
         emit("error", message=t("export.adapter_not_found", path=args.adapter_path))
         sys.exit(1)
-    adapter_files = [
-        f for f in os.listdir(args.adapter_path)
-        if f.endswith(".safetensors") or f.endswith(".npz")
-    ]
+    with os.scandir(args.adapter_path) as it:
+        adapter_files = [
+            e.name for e in it
+            if e.name.endswith((".safetensors", ".npz")) and e.is_file()
+        ]
     if not adapter_files:
         emit("error", message=t("export.no_adapter_weights", path=args.adapter_path))
         sys.exit(1)
@@ -489,11 +688,9 @@ def _run(args):
          desc=f"Adapter: {args.adapter_path} ({len(adapter_files)} weight files)")
 
     fused_dir = os.path.join(args.output_dir, "fused")
-    if os.path.isdir(fused_dir):
-        # The export target directory is reused per project. Clean it first so
-        # stale files from previous runs cannot pollute the current export.
-        shutil.rmtree(fused_dir, ignore_errors=True)
-    os.makedirs(fused_dir, exist_ok=True)
+    # The export target directory is reused per project. Clean it first so
+    # stale files from previous runs cannot pollute the current export.
+    _reset_dir(fused_dir)
 
     # Step 3: Try GGUF export first (fast path for Llama/Mistral/Mixtral)
     emit("progress", step="fuse",
@@ -505,6 +702,9 @@ def _run(args):
     if model_output is None:
         emit("progress", step="fuse",
              desc=t("export.gguf_fallback"))
+        # mlx_lm.fuse saves the fused weights before it rejects GGUF export,
+        # and save_model never deletes files, so start from an empty dir again.
+        _reset_dir(fused_dir)
         try:
             model_output, model_format = fuse_and_dequantize_direct(
                 resolved, args.adapter_path, fused_dir
@@ -515,18 +715,22 @@ def _run(args):
 
     # Step 3.5: Binary safety net — remove any non-float tensors from safetensors
     # Even after proper dequantization, some edge cases may leave U32/I32 artifacts.
+    # A header-only scan decides whether the rewriting cleaner is needed at all;
+    # fused_dir was emptied before the save above, so there are no stale shards.
     if model_format == "safetensors":
         emit("progress", step="convert",
              desc=t("export.verify_start"))
         try:
-            kept, removed = clean_safetensors_for_ollama(model_output)
-            config_cleaned = clean_config_for_ollama(model_output)
+            # The cleaner also drops tensor names repeated across files.
+            bad_dtypes, tensor_count, duplicates = verify_safetensors_dtypes(model_output)
+            if bad_dtypes or duplicates:
+                kept, removed = clean_safetensors_for_ollama(model_output)
+            else:
+                kept, removed = tensor_count, 0
             parts = []
             if removed:
                 parts.append(t("export.removed_tensors", count=removed))
             parts.append(t("export.tensors_ready", count=kept))
-            if config_cleaned:
-                parts.append(t("export.config_cleaned"))
             emit("progress", step="convert", desc=t("export.verify_done", details='; '.join(parts)))
         except Exception as e:
             emit("progress", step="convert",
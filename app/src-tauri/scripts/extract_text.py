@@ -11,19 +11,34 @@ import argparse
 
 
 def extract_pdf(path):
-    """Extract text from a PDF file using PyPDF2."""
+    """Extract text from a PDF file using pypdfium2, falling back to PyPDF2."""
     try:
-        import PyPDF2
+        import pypdfium2 as pdfium
     except ImportError:
-        return None
+        pdfium = None
+    if pdfium is None:
+        try:
+            import PyPDF2
+        except ImportError:
+            return None
     try:
         text_parts = []
-        with open(path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        if pdfium is not None:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                for page in pdf:
+                    page_text = page.get_textpage().get_text_range()
+                    if page_text:
+                        text_parts.append(page_text.replace("\r\n", "\n"))
+            finally:
+                pdf.close()
+        else:
+            with open(path, "rb") as f:
+                reader = PyPDF2.PdfReader(f)
+                for page in reader.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_parts.append(page_text)
         return "\n\n".join(text_parts) if text_parts else ""
     except Exception:
         return ""
@@ -4,6 +4,7 @@
 Key design:
  - Uses /api/chat with think:false to disable thinking mode (GLM/Qwen3 etc.)
  - num_predict=2048 to ensure enough tokens for JSON output
+ - keep_alive=30m so the model stays loaded for the whole run
  - Reads both 'content' and 'thinking' fields from response
  - Incremental save: each success is appended to file immediately
  - Resume: on restart, skips already-processed segments
@@ -11,19 +12,46 @@ Key design:
 """
 
 import argparse
+import hashlib
+import http.client
+import io
 import json
 import os
 import re
+import shutil
+import signal
+import socket
 import sys
-import urllib.request
+import threading
 import urllib.error
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 
+from events import batch_events, emit, flush_events, json_bytes, json_loads, json_loads_fast
 from i18n import t, pt, init_i18n, init_prompt_i18n, detect_content_language, add_lang_arg
 
-
-def emit(event_type, **kwargs):
-    payload = {"type": event_type, **kwargs}
-    print(json.dumps(payload, ensure_ascii=False), flush=True)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+OLLAMA_HOST = "localhost"
+OLLAMA_PORT = 11434
+OLLAMA_CHAT_PATH = "/api/chat"
+OLLAMA_CHAT_URL = f"http://{OLLAMA_HOST}:{OLLAMA_PORT}{OLLAMA_CHAT_PATH}"
+OLLAMA_TIMEOUT = 300
+
+# Patterns used on every response/segment; compiled once at import.
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?\s*```', re.DOTALL)
+_BRACE_RE = re.compile(r'\{[^{}]*\}')
+_BRACE_POS_RE = re.compile(r'[{}]')
+_FENCE_OPEN_RE = re.compile(r"^```(?:json)?", re.IGNORECASE)
+_FENCE_CLOSE_RE = re.compile(r"```$")
+_TRAILING_BRACE_RE = re.compile(r"\s*}\s*$")
+_TRAILING_COMMA_RE = re.compile(r",\s*$")
+# Characters repair_json_string has to look at; everything else is copied in bulk.
+_REPAIR_SPECIAL_RE = re.compile(r'[\\"\n\t]')
 
 
 def get_system_prompts():
@@ -46,11 +74,9 @@ def get_user_templates():
     }
 
 
-def call_ollama(model: str, system_prompt: str, user_message: str,
-                temperature: float = 0.7, num_predict: int = 2048) -> dict:
-    """Call Ollama Chat API. Returns the full API response dict for inspection."""
-    url = "http://localhost:11434/api/chat"
-    payload = {
+def _chat_payload(model: str, system_prompt: str, user_message: str,
+                  temperature: float, num_predict: int) -> dict:
+    return {
         "model": model,
         "messages": [
             {"role": "system", "content": system_prompt},
@@ -58,27 +84,151 @@ def call_ollama(model: str, system_prompt: str, user_message: str,
         ],
         "stream": False,
         "think": False,
+        # Keep the model resident between segments instead of letting the
+        # scheduler unload it after its default 5-minute idle window.
+        "keep_alive": "30m",
         "options": {
             "num_predict": num_predict,
             "temperature": temperature,
         }
     }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=data,
-        headers={"Content-Type": "application/json"},
-    )
-    with urllib.request.urlopen(req, timeout=300) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+
+
+# One keep-alive connection per thread (main + generation workers). All of
+# them are also tracked so close_chat_connections() can abort in-flight calls.
+_http_local = threading.local()
+_http_connections = set()
+_http_connections_lock = threading.Lock()
+_http_closing = threading.Event()
+
+
+def _chat_connection(timeout: float) -> http.client.HTTPConnection:
+    conn = getattr(_http_local, "conn", None)
+    if conn is None:
+        conn = http.client.HTTPConnection(OLLAMA_HOST, OLLAMA_PORT, timeout=timeout)
+        _http_local.conn = conn
+        with _http_connections_lock:
+            _http_connections.add(conn)
+    elif conn.timeout != timeout:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def close_chat_connections():
+    """Abort every in-flight Ollama request and refuse new ones.
+
+    Worker threads blocked reading a reply would otherwise hold interpreter
+    exit for up to the request timeout after the script has given up.
+    """
+    _http_closing.set()
+    with _http_connections_lock:
+        conns = list(_http_connections)
+    for conn in conns:
+        sock = conn.sock
+        if sock is not None:
+            try:
+                # Wakes a recv() blocked in another thread; close() alone does not.
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def post_chat(data: bytes, timeout: float = OLLAMA_TIMEOUT) -> dict:
+    """POST an encoded request body to the Ollama Chat API and decode the reply.
+
+    Reuses this thread's keep-alive connection instead of opening a socket
+    per request. Errors surface as urlopen would raise them: connect/send
+    failures as URLError, non-2xx replies as HTTPError.
+    """
+    if _http_closing.is_set():
+        raise urllib.error.URLError("connections closed")
+    conn = _chat_connection(timeout)
+    # A reused socket may have been closed by the server while idle; that
+    # shows up on send or as an empty reply, and is retried once afresh.
+    retry = conn.sock is not None
+    while True:
+        try:
+            try:
+                conn.request("POST", OLLAMA_CHAT_PATH, body=data,
+                             headers={"Content-Type": "application/json"})
+            except OSError as e:
+                if retry and isinstance(e, ConnectionError) and not _http_closing.is_set():
+                    conn.close()
+                    retry = False
+                    continue
+                raise urllib.error.URLError(e)
+            # close_chat_connections() may have run while this thread was
+            # still connecting, before there was a socket for it to shut down.
+            if _http_closing.is_set():
+                raise urllib.error.URLError("connections closed")
+            resp = conn.getresponse()
+            body = resp.read()
+        except ConnectionError:
+            conn.close()
+            if retry and not _http_closing.is_set():
+                retry = False
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        break
+
+    if not 200 <= resp.status < 300:
+        raise urllib.error.HTTPError(OLLAMA_CHAT_URL, resp.status, resp.reason,
+                                     resp.headers, io.BytesIO(body))
+    return json_loads(body)
+
+
+def call_ollama(model: str, system_prompt: str, user_message: str,
+                temperature: float = 0.7, num_predict: int = 2048) -> dict:
+    """Call Ollama Chat API. Returns the full API response dict for inspection."""
+    payload = _chat_payload(model, system_prompt, user_message, temperature, num_predict)
+    return post_chat(json_bytes(payload))
+
+
+def make_chat_encoder(model: str, system_prompt: str,
+                      temperature: float = 0.7, num_predict: int = 2048):
+    """Return user_message -> request body for a fixed model/system prompt.
+
+    Everything except the user message is encoded once; each call only
+    encodes the message and splices it between the cached prefix and suffix,
+    producing the same bytes call_ollama would send.
+    """
+    marker = "\0user_message\0"
+    body = json_bytes(_chat_payload(model, system_prompt, marker, temperature, num_predict))
+    # The user message is the last free-form string in the payload.
+    head, _, tail = body.rpartition(json_bytes(marker))
+
+    def encode(user_message: str) -> bytes:
+        return head + json_bytes(user_message) + tail
+
+    return encode
+
+
+def _bigram_codes(text: str):
+    """Unique character bigrams of text as packed uint64 codes (numpy array)."""
+    # surrogatepass: lone surrogates from model output become plain code points.
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+    # Code points fit in 21 bits, so (first << 21) | second is collision-free.
+    return np.unique((codes[:-1] << 21) | codes[1:])
 
 
 def text_similarity(a: str, b: str) -> float:
     """Simple character-level Jaccard similarity between two texts."""
     if not a or not b:
         return 0.0
+    a = a.replace(" ", "").replace("\n", "")
+    b = b.replace(" ", "").replace("\n", "")
+    if np is not None and len(a) > 1 and len(b) > 1:
+        codes_a = _bigram_codes(a)
+        codes_b = _bigram_codes(b)
+        intersection = np.intersect1d(codes_a, codes_b, assume_unique=True).size
+        return intersection / (codes_a.size + codes_b.size - intersection)
     # Use character n-grams (bigrams) for comparison
     def bigrams(text):
-        text = text.replace(" ", "").replace("\n", "")
         return set(text[i:i+2] for i in range(len(text) - 1)) if len(text) > 1 else {text}
     set_a = bigrams(a)
     set_b = bigrams(b)
@@ -93,8 +243,19 @@ def dominant_script(text: str) -> str:
     """Return dominant script family: latin / cjk / mixed."""
     if not text:
         return "mixed"
-    cjk = len(re.findall(r'[\u4e00-\u9fff]', text))
-    latin = len(re.findall(r'[A-Za-z]', text))
+    if np is not None:
+        # One vectorized pass over the code points
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        cjk = int(np.count_nonzero((codes >= 0x4E00) & (codes <= 0x9FFF)))
+        folded = codes | 0x20  # A-Z -> a-z; no other code point lands in a-z
+        latin = int(np.count_nonzero((folded >= 0x61) & (folded <= 0x7A)))
+    else:
+        cjk = latin = 0
+        for ch in text:
+            if "\u4e00" <= ch <= "\u9fff":
+                cjk += 1
+            elif "a" <= ch <= "z" or "A" <= ch <= "Z":
+                latin += 1
     if cjk >= 20 and cjk > latin * 2:
         return "cjk"
     if latin >= 40 and latin > cjk * 2:
@@ -124,6 +285,10 @@ QA_ANSWER_KEYS = ("answer", "Answer", "回答", "答案", "response", "reply", "
 INSTRUCTION_KEYS = ("instruction", "Instruction", "指令", "任务", "要求", "prompt")
 OUTPUT_KEYS = ("output", "Output", "回答", "答案", "response", "reply", "回复", "内容")
 CHAT_KEYS = ("conversations", "conversation", "dialogue", "dialog", "messages", "对话", "聊天记录")
+USER_ROLES = frozenset({"user", "human", "用户", "提问者", "问者"})
+ASSISTANT_ROLES = frozenset({"assistant", "ai", "bot", "助手", "回答者", "答者"})
+# Lower-cased role label -> canonical chat role
+ROLE_MAP = {**dict.fromkeys(USER_ROLES, "user"), **dict.fromkeys(ASSISTANT_ROLES, "assistant")}
 
 
 def _pick_first_text(data: dict, keys: tuple[str, ...]) -> str:
@@ -169,11 +334,8 @@ def normalize_mode_payload(data: dict, mode: str) -> dict:
                     continue
 
                 role_text = str(role).strip().lower() if role is not None else ""
-                if role_text in {"user", "human", "用户", "提问者", "问者"}:
-                    norm_role = "user"
-                elif role_text in {"assistant", "ai", "bot", "助手", "回答者", "答者"}:
-                    norm_role = "assistant"
-                else:
+                norm_role = ROLE_MAP.get(role_text)
+                if norm_role is None:
                     norm_role = "assistant" if normalized and normalized[-1]["role"] == "user" else "user"
 
                 normalized.append({"role": norm_role, "content": content.strip()})
@@ -214,31 +376,28 @@ def repair_json_string(s: str) -> str:
     s = s.replace('\u2018', "'").replace('\u2019', "'")
     # Fix unescaped newlines within JSON strings
     # (newlines that are not preceded by a backslash)
-    # We do this by replacing literal newlines inside string values
-    result = []
+    # We do this by replacing literal newlines inside string values; only
+    # backslashes, quotes, newlines and tabs are visited, the text between
+    # them is copied as whole slices.
+    parts = []
+    last = 0
     in_string = False
-    escape_next = False
-    for ch in s:
-        if escape_next:
-            result.append(ch)
-            escape_next = False
+    escaped_pos = -1
+    for m in _REPAIR_SPECIAL_RE.finditer(s):
+        i = m.start()
+        if i == escaped_pos:
             continue
+        ch = s[i]
         if ch == '\\':
-            result.append(ch)
-            escape_next = True
-            continue
-        if ch == '"':
+            escaped_pos = i + 1
+        elif ch == '"':
             in_string = not in_string
-            result.append(ch)
-            continue
-        if in_string and ch == '\n':
-            result.append('\\n')
-            continue
-        if in_string and ch == '\t':
-            result.append('\\t')
-            continue
-        result.append(ch)
-    return ''.join(result)
+        elif in_string:
+            parts.append(s[last:i])
+            parts.append('\\n' if ch == '\n' else '\\t')
+            last = i + 1
+    parts.append(s[last:])
+    return ''.join(parts)
 
 
 def _cleanup_extracted_value(raw: str) -> str:
@@ -246,8 +405,8 @@ def _cleanup_extracted_value(raw: str) -> str:
     if not value:
         return ""
 
-    value = re.sub(r"^```(?:json)?", "", value, flags=re.IGNORECASE).strip()
-    value = re.sub(r"```$", "", value).strip()
+    value = _FENCE_OPEN_RE.sub("", value).strip()
+    value = _FENCE_CLOSE_RE.sub("", value).strip()
 
     if value.startswith(("\"", "'")):
         quote = value[0]
@@ -256,40 +415,63 @@ def _cleanup_extracted_value(raw: str) -> str:
             value = value[:-1]
 
     value = value.strip()
-    value = re.sub(r"\s*}\s*$", "", value)
-    value = re.sub(r",\s*$", "", value)
+    value = _TRAILING_BRACE_RE.sub("", value)
+    value = _TRAILING_COMMA_RE.sub("", value)
     value = value.replace('\\"', '"').replace("\\n", "\n").replace("\\t", "\t")
     return value.strip()
 
 
-def _extract_between(text: str, current_keys: tuple[str, ...], next_keys: tuple[str, ...]) -> str:
+def _between_regex(current_keys: tuple[str, ...], next_keys: tuple[str, ...]) -> re.Pattern:
     current = "|".join(re.escape(k) for k in current_keys)
     nxt = "|".join(re.escape(k) for k in next_keys)
     pattern = rf'["\']?(?:{current})["\']?\s*[:：]\s*(.+?)\s*,\s*["\']?(?:{nxt})["\']?\s*[:：]'
-    m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-    return m.group(1).strip() if m else ""
+    return re.compile(pattern, re.DOTALL | re.IGNORECASE)
 
 
-def _extract_tail(text: str, current_keys: tuple[str, ...]) -> str:
+def _tail_regex(current_keys: tuple[str, ...]) -> re.Pattern:
     current = "|".join(re.escape(k) for k in current_keys)
     pattern = rf'["\']?(?:{current})["\']?\s*[:：]\s*(.+?)(?:\s*}}\s*$|\s*$)'
-    m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+    return re.compile(pattern, re.DOTALL | re.IGNORECASE)
+
+
+# The key tuples are constants, so the fallback patterns are built once here.
+_QA_QUESTION_RE = _between_regex(QA_QUESTION_KEYS, QA_ANSWER_KEYS)
+_QA_ANSWER_RE = _tail_regex(QA_ANSWER_KEYS)
+_INSTRUCTION_RE = _between_regex(INSTRUCTION_KEYS, OUTPUT_KEYS)
+_OUTPUT_RE = _tail_regex(OUTPUT_KEYS)
+
+
+def _extract_group(pattern: re.Pattern, text: str) -> str:
+    m = pattern.search(text)
     return m.group(1).strip() if m else ""
 
 
-def extract_key_value_fallback(text: str, mode: str) -> dict | None:
-    """Last-resort extraction: find key fields by regex patterns."""
+def _iter_flat_json_objects(text: str):
+    """Yield every brace-free {...} span of text that parses as JSON."""
+    for m in _BRACE_RE.finditer(text):
+        try:
+            yield json_loads_fast(m.group())
+        except json.JSONDecodeError:
+            continue
+
+
+def extract_key_value_fallback(text: str, mode: str, flat_objects: list | None = None) -> dict | None:
+    """Last-resort extraction: find key fields by regex patterns.
+
+    flat_objects may carry the already-parsed _iter_flat_json_objects(text)
+    so a caller that needs them too doesn't parse the same spans twice.
+    """
     if mode == "qa":
-        q_raw = _extract_between(text, QA_QUESTION_KEYS, QA_ANSWER_KEYS)
-        a_raw = _extract_tail(text, QA_ANSWER_KEYS)
+        q_raw = _extract_group(_QA_QUESTION_RE, text)
+        a_raw = _extract_group(_QA_ANSWER_RE, text)
         question = _cleanup_extracted_value(q_raw)
         answer = _cleanup_extracted_value(a_raw)
         if question and answer:
             return {"question": question, "answer": answer}
 
     elif mode in ("style", "instruct"):
-        inst_raw = _extract_between(text, INSTRUCTION_KEYS, OUTPUT_KEYS)
-        out_raw = _extract_tail(text, OUTPUT_KEYS)
+        inst_raw = _extract_group(_INSTRUCTION_RE, text)
+        out_raw = _extract_group(_OUTPUT_RE, text)
         instruction = _cleanup_extracted_value(inst_raw)
         output = _cleanup_extracted_value(out_raw)
         if instruction and output:
@@ -299,7 +481,7 @@ def extract_key_value_fallback(text: str, mode: str) -> dict | None:
         # Try to salvage chat payload as JSON object first, then normalize keys.
         obj = None
         try:
-            obj = json.loads(repair_json_string(text))
+            obj = json_loads_fast(repair_json_string(text))
         except Exception:
             obj = None
         if isinstance(obj, dict):
@@ -310,23 +492,18 @@ def extract_key_value_fallback(text: str, mode: str) -> dict | None:
 
         # Fallback: collect all {"role": ..., "content": ...} objects (handles truncated JSON)
         role_content_objs = []
-        for m in re.finditer(r'\{[^{}]*\}', text):
-            try:
-                inner = json.loads(m.group())
-                if isinstance(inner, dict) and "role" in inner and "content" in inner:
-                    role_text = str(inner["role"]).strip().lower()
-                    content_text = str(inner["content"]).strip()
-                    if not content_text:
-                        continue
-                    if role_text in ("user", "human", "用户", "提问者"):
-                        norm_role = "user"
-                    elif role_text in ("assistant", "ai", "bot", "助手"):
-                        norm_role = "assistant"
-                    else:
-                        norm_role = "assistant" if role_content_objs and role_content_objs[-1]["role"] == "user" else "user"
-                    role_content_objs.append({"role": norm_role, "content": content_text})
-            except (json.JSONDecodeError, KeyError):
-                continue
+        if flat_objects is None:
+            flat_objects = _iter_flat_json_objects(text)
+        for inner in flat_objects:
+            if "role" in inner and "content" in inner:
+                role_text = str(inner["role"]).strip().lower()
+                content_text = str(inner["content"]).strip()
+                if not content_text:
+                    continue
+                norm_role = ROLE_MAP.get(role_text)
+                if norm_role is None:
+                    norm_role = "assistant" if role_content_objs and role_content_objs[-1]["role"] == "user" else "user"
+                role_content_objs.append({"role": norm_role, "content": content_text})
         if len(role_content_objs) >= 2:
             return {"conversations": role_content_objs}
 
@@ -341,13 +518,13 @@ def parse_json_response(text: str, mode: str = "") -> dict | None:
     cleaned = text.strip()
 
     # 1. Strip markdown code blocks: ```json ... ``` or ``` ... ```
-    code_block = re.search(r'```(?:json)?\s*\n?(.*?)\n?\s*```', cleaned, re.DOTALL)
+    code_block = _CODE_BLOCK_RE.search(cleaned)
     if code_block:
         cleaned = code_block.group(1).strip()
 
     # 2. Try direct parse
     try:
-        obj = json.loads(cleaned)
+        obj = json_loads_fast(cleaned)
         if isinstance(obj, dict):
             return normalize_mode_payload(obj, mode) if mode else obj
     except json.JSONDecodeError:
@@ -356,33 +533,36 @@ def parse_json_response(text: str, mode: str = "") -> dict | None:
     # 3. Try with JSON repair (fix unescaped quotes/newlines)
     try:
         repaired = repair_json_string(cleaned)
-        obj = json.loads(repaired)
+        obj = json_loads_fast(repaired)
         if isinstance(obj, dict):
             return normalize_mode_payload(obj, mode) if mode else obj
     except json.JSONDecodeError:
         pass
 
     # 4. Find outermost balanced { ... } and try parsing
+    #    Only brace positions matter for the depth count, so let the regex
+    #    engine skip everything else.
     depth = 0
     start = -1
-    for i, ch in enumerate(cleaned):
-        if ch == '{':
+    for m in _BRACE_POS_RE.finditer(cleaned):
+        i = m.start()
+        if m.group() == '{':
             if depth == 0:
                 start = i
             depth += 1
-        elif ch == '}':
+        else:
             depth -= 1
             if depth == 0 and start >= 0:
                 candidate = cleaned[start:i + 1]
                 try:
-                    obj = json.loads(candidate)
+                    obj = json_loads_fast(candidate)
                     if isinstance(obj, dict):
                         return normalize_mode_payload(obj, mode) if mode else obj
                 except json.JSONDecodeError:
                     # Try repair on the candidate
                     try:
                         repaired = repair_json_string(candidate)
-                        obj = json.loads(repaired)
+                        obj = json_loads_fast(repaired)
                         if isinstance(obj, dict):
                             return normalize_mode_payload(obj, mode) if mode else obj
                     except json.JSONDecodeError:
@@ -390,19 +570,18 @@ def parse_json_response(text: str, mode: str = "") -> dict | None:
                 start = -1
 
     # 5. Regex-based key-value extraction as last resort
+    #    (chat mode scans the flat {...} objects that step 6 needs as well)
+    flat_objects = None
     if mode:
-        result = extract_key_value_fallback(text, mode)
+        if mode == "chat":
+            flat_objects = list(_iter_flat_json_objects(text))
+        result = extract_key_value_fallback(text, mode, flat_objects)
         if result:
             return result
 
     # 6. Find any JSON-like pattern
-    for m in re.finditer(r'\{[^{}]*\}', text):
-        try:
-            obj = json.loads(m.group())
-            if isinstance(obj, dict):
-                return normalize_mode_payload(obj, mode) if mode else obj
-        except json.JSONDecodeError:
-            continue
+    for obj in flat_objects if flat_objects is not None else _iter_flat_json_objects(text):
+        return normalize_mode_payload(obj, mode) if mode else obj
 
     return None
 
@@ -434,30 +613,138 @@ def to_chat_format(data: dict, mode: str) -> dict | None:
 
 
 def load_existing_progress(dataset_dir: str) -> int:
-    """Count existing lines in train.jsonl to support resume."""
+    """Count existing lines in train.jsonl to support resume.
+
+    The writer emits exactly one non-empty line per sample, so counting
+    newline bytes in large chunks is enough; an unterminated last line
+    (interrupted write) still counts as a sample.
+    """
     train_path = os.path.join(dataset_dir, "train.jsonl")
     if not os.path.exists(train_path):
         return 0
     count = 0
-    with open(train_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                count += 1
+    last = b"\n"
+    with open(train_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        count += 1
     return count
 
 
+# Successful generations across all runs of a project, keyed by content so
+# --resume can replay them instead of asking the model again. One entry per
+# line: "<key>\t<output length>\t<train.jsonl record>\n".
+GENERATION_CACHE_NAME = ".generation_cache"
+
+
+def generation_cache_key(model: str, mode: str, text: str) -> str:
+    return hashlib.blake2b(f"{model}|{mode}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _scan_generation_cache(path: str) -> tuple[dict[str, int], int]:
+    """Return (cache key -> offset of its latest entry, number of lines)."""
+    index: dict[str, int] = {}
+    if not os.path.exists(path):
+        return index, 0
+    pos = 0
+    lines = 0
+    with open(path, "rb") as f:
+        for line in f:
+            lines += 1
+            # Skip malformed lines and a torn last write.
+            if line[32:33] == b"\t" and line.endswith(b"\n"):
+                index[line[:32].decode("latin-1")] = pos
+            pos += len(line)
+    return index, lines
+
+
+def load_generation_cache(path: str) -> dict[str, int]:
+    """Map cache key -> offset of its latest entry; entry bodies stay on disk.
+
+    A run may append entries for keys that are already cached; once the
+    superseded ones outnumber the live ones the file is compacted down to
+    the latest entry per key.
+    """
+    index, lines = _scan_generation_cache(path)
+    if lines > 2 * len(index):
+        index = _compact_generation_cache(path, index)
+    return index
+
+
+def prune_generation_cache(path: str, keep_keys) -> None:
+    """Drop every cache entry except the latest one for each key in keep_keys.
+
+    Called at the end of a run with that run's keys, so the cache never holds
+    more than one run's worth of samples however many models, modes and
+    segment sets the project has been through.
+    """
+    index, lines = _scan_generation_cache(path)
+    keep = {key: offset for key, offset in index.items() if key in keep_keys}
+    if lines > len(keep):
+        _compact_generation_cache(path, keep)
+
+
+def _compact_generation_cache(path: str, index: dict[str, int]) -> dict[str, int]:
+    """Rewrite the cache with only the entries in index; returns their new offsets."""
+    compacted: dict[str, int] = {}
+    tmp_path = path + ".tmp"
+    pos = 0
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        for key, offset in sorted(index.items(), key=lambda item: item[1]):
+            src.seek(offset)
+            line = src.readline()
+            dst.write(line)
+            compacted[key] = pos
+            pos += len(line)
+    os.replace(tmp_path, path)
+    return compacted
+
+
+def read_generation_cache(f, offset: int) -> tuple[int, bytes] | None:
+    """Return (output length, record line) of the cache entry at offset."""
+    f.seek(offset)
+    parts = f.readline().split(b"\t", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return None
+    return int(parts[1]), parts[2]
+
+
+def _record_digest(line: bytes) -> bytes:
+    return hashlib.blake2b(line, digest_size=16).digest()
+
+
+def count_train_records(train_path: str) -> Counter:
+    """Multiset of the (digests of the) records already in train.jsonl."""
+    counts: Counter = Counter()
+    if os.path.exists(train_path):
+        with open(train_path, "rb") as f:
+            for line in f:
+                counts[_record_digest(line)] += 1
+    return counts
+
+
+# Segments shorter than this (after stripping) are too thin to generate from.
+MIN_SEGMENT_CHARS = 20
+# Longer segments are truncated to this many characters in the prompt.
+MAX_PROMPT_SEGMENT_CHARS = 2000
+
+
 def load_segments_from_file(path: str) -> list[dict]:
     """Load segment records from jsonl/text file and normalize to {'text': ...} objects."""
     records: list[dict] = []
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
-            if not line:
+            # Decoding never makes a JSON string longer than its source, so a
+            # line this short can't hold a usable segment; skip the parse.
+            if len(line) < MIN_SEGMENT_CHARS:
                 continue
 
             raw_obj = None
             try:
-                raw_obj = json.loads(line)
+                raw_obj = json_loads(line)
             except json.JSONDecodeError:
                 raw_obj = {"text": line}
 
@@ -470,7 +757,7 @@ def load_segments_from_file(path: str) -> list[dict]:
             else:
                 continue
 
-            if len(text) < 20:
+            if len(text) < MIN_SEGMENT_CHARS:
                 continue
 
             record["text"] = text
@@ -479,6 +766,50 @@ def load_segments_from_file(path: str) -> list[dict]:
     return records
 
 
+def split_train_valid(train_path: str, valid_path: str,
+                      offsets: array | None = None) -> tuple[int, int]:
+    """Split train.jsonl in place: its last 10% of records move to valid.jsonl.
+
+    Only line offsets are kept in memory; the tail is streamed into
+    valid.jsonl and train.jsonl is truncated, so the kept 90% is never
+    rewritten. A single record is copied to both files.
+
+    offsets: start offset of every record, if the caller wrote the whole
+    file and tracked them; otherwise train.jsonl is scanned for them.
+    """
+    if offsets is None:
+        offsets = array("q")
+        pos = 0
+        with open(train_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                pos += len(line)
+    else:
+        pos = os.path.getsize(train_path)
+
+    if len(offsets) > 1:
+        split_idx = max(1, int(len(offsets) * 0.9))
+        cut = offsets[split_idx]
+    else:
+        split_idx = len(offsets)
+        cut = offsets[0] if offsets else pos
+
+    with open(train_path, "rb") as src, open(valid_path, "wb") as dst:
+        src.seek(cut)
+        shutil.copyfileobj(src, dst)
+        if dst.tell():
+            # Keep valid.jsonl newline-terminated even if train.jsonl was not.
+            src.seek(-1, os.SEEK_END)
+            if src.read(1) != b"\n":
+                dst.write(b"\n")
+
+    if len(offsets) > 1:
+        os.truncate(train_path, cut)
+        return split_idx, len(offsets) - split_idx
+    return len(offsets), len(offsets)
+
+
 def compute_quality_score(total: int, success: int, avg_output_len: float) -> tuple[float, str]:
     """Compute a lightweight dataset quality score (0-100) and grade (A/B/C)."""
     if total <= 0:
@@ -508,10 +839,16 @@ def main():
     parser.add_argument("--resume", action="store_true", help="Resume from previous progress")
     parser.add_argument("--input-segments", default=None, help="Optional segments jsonl input path")
     parser.add_argument("--quality-scoring", action="store_true", help="Enable post-generation quality scoring")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of generation requests kept in flight against Ollama "
+                             "(only helps when OLLAMA_NUM_PARALLEL allows that many)")
+    parser.add_argument("--flush-every", type=int, default=10,
+                        help="Flush and fsync train.jsonl after this many new samples")
     add_lang_arg(parser)
     args = parser.parse_args()
 
     init_i18n(args.lang)
+    batch_events()
 
     segments_path = args.input_segments or os.path.join(args.project_dir, "cleaned", "segments.jsonl")
     if not os.path.exists(segments_path):
@@ -536,19 +873,56 @@ def main():
     train_path = os.path.join(dataset_dir, "train.jsonl")
     valid_path = os.path.join(dataset_dir, "valid.jsonl")
 
+    total = len(segments)
+
+    # Successful generations of every run are cached by segment content.
+    cache_path = os.path.join(args.project_dir, "dataset", GENERATION_CACHE_NAME)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    cache_index = load_generation_cache(cache_path)
+    segment_keys = [generation_cache_key(args.model, args.mode, seg) for seg in segments]
+    cache_reader = None
+    done: set[int] = set()     # already in train.jsonl
+    cached: set[int] = set()   # to be replayed from the cache
+
     # Check for resume
     skip_count = 0
+    start = 0
     if args.resume:
         skip_count = load_existing_progress(dataset_dir)
+        start = skip_count
+        if cache_index:
+            # Match segments to records by content: a cached record that is
+            # already in train.jsonl is done, any other cached one is replayed.
+            cache_reader = open(cache_path, "rb")
+            present = count_train_records(train_path) if skip_count else Counter()
+            for i, key in enumerate(segment_keys):
+                offset = cache_index.get(key)
+                entry = read_generation_cache(cache_reader, offset) if offset is not None else None
+                if entry is None:
+                    continue
+                digest = _record_digest(entry[1])
+                if present[digest] > 0:
+                    present[digest] -= 1
+                    done.add(i)
+                else:
+                    cached.add(i)
+            # Only when every existing record is accounted for can segments be
+            # skipped by content alone; otherwise keep the count-based start.
+            if not +present:
+                start = 0
+            done = {i for i in done if i >= start}
+            cached = {i for i in cached if i >= start}
         if skip_count > 0:
-            emit("log", message=t("gen.resume_found", skip=skip_count, next=skip_count + 1))
-
-    total = len(segments)
+            next_pending = next((i for i in range(start, total) if i not in done), total)
+            emit("log", message=t("gen.resume_found", skip=skip_count, next=next_pending + 1))
+        if cached:
+            emit("log", message=t("gen.cache_found", count=len(cached)))
     emit("progress", step=skip_count, total=total,
          desc=t("gen.starting", model=args.model))
     emit("log", message=t("gen.connecting", model=args.model, mode=args.mode, total=total, skip=skip_count))
 
-    # Verify connection with a simple test
+    # Verify connection with a simple test (the model may take a while to load)
+    flush_events()
     try:
         test_result = call_ollama(args.model, t("gen.test_hello"), t("gen.test_reply"))
         test_content = extract_text_from_response(test_result)
@@ -581,23 +955,102 @@ def main():
     failed_records: list[dict] = []
     output_lengths: list[int] = []
 
+    # Chat/style modes need more tokens (conversation arrays / creative content)
+    n_predict = 4096 if args.mode in ("style", "chat") else 2048
+
+    encode_request = make_chat_encoder(args.model, system_prompt, temperature=temp, num_predict=n_predict)
+    keep_language = f"\n\n{pt('gen.prompt.keep_language')}"
+
+    def request_segment(index: int) -> dict:
+        text = segments[index]
+        if len(text) > MAX_PROMPT_SEGMENT_CHARS:
+            text = text[:MAX_PROMPT_SEGMENT_CHARS]
+        user_msg = user_template.format(text=text) + keep_language
+        return post_chat(encode_request(user_msg), timeout=request_timeout)
+
+    # Requests are I/O-bound, so keep several in flight while results are
+    # still consumed (and written) strictly in segment order for --resume.
+    concurrency = max(1, args.concurrency)
+    # A single-slot Ollama serves in-flight requests one after another, so a
+    # request may wait behind all the others before its own generation starts.
+    request_timeout = OLLAMA_TIMEOUT * concurrency
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    in_flight = deque()
+    next_index = start
+
+    cache_file = open(cache_path, "ab", buffering=1 << 20)
+
     # Open files for incremental append
-    file_mode = "a" if args.resume and skip_count > 0 else "w"
-    train_file = open(train_path, file_mode, encoding="utf-8")
+    file_mode = "ab" if args.resume and skip_count > 0 else "wb"
+    train_file = open(train_path, file_mode, buffering=1 << 20)
+    # Start offset of every record written to a fresh train.jsonl, so the
+    # valid split can cut it without rescanning the file.
+    record_offsets = array("q") if file_mode == "wb" else None
+    train_pos = 0
+    flush_every = max(1, args.flush_every)
+    pending_since_flush = 0
+
+    def sync_train_file():
+        cache_file.flush()
+        train_file.flush()
+        os.fsync(train_file.fileno())
+
+    def write_record(line: bytes):
+        nonlocal train_pos, pending_since_flush
+        if record_offsets is not None:
+            record_offsets.append(train_pos)
+            train_pos += len(line)
+        train_file.write(line)
+        pending_since_flush += 1
+        if pending_since_flush >= flush_every:
+            sync_train_file()
+            pending_since_flush = 0
+
+    # Stopping generation sends SIGTERM; persist the buffered samples first so
+    # --resume picks up after the last one that was actually generated.
+    def on_sigterm(signum, frame):
+        try:
+            sync_train_file()
+            flush_events()
+        except (OSError, RuntimeError, ValueError):
+            pass
+        os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
 
     try:
-        for i in range(skip_count, total):
+        for i in range(start, total):
+            while next_index < total and len(in_flight) < concurrency:
+                if next_index not in cached and next_index not in done:
+                    in_flight.append(pool.submit(request_segment, next_index))
+                next_index += 1
+            if i in done:
+                continue
+
             text = segments[i]
             segment_record = dict(segment_records[i])
             segment_preview = text[:80].replace("\n", " ")
             emit("log", message=t("gen.segment_header", current=i+1, total=total, preview=segment_preview))
 
+            entry = read_generation_cache(cache_reader, cache_index[segment_keys[i]]) if i in cached else None
+            if entry is not None:
+                output_len, line = entry
+                success_count += 1
+                output_lengths.append(output_len)
+                write_record(line)
+                emit("log", message=t("gen.cache_hit", count=success_count))
+                emit("progress", step=i + 1, total=total,
+                     desc=t("gen.progress_status", success=success_count, failed=failed))
+                continue
+            if i in cached:
+                # Unreadable cache entry: generate this segment after all.
+                in_flight.appendleft(pool.submit(request_segment, i))
+            pending = in_flight.popleft()
+
             try:
-                user_msg = user_template.format(text=text[:2000])
-                user_msg = f"{user_msg}\n\n{pt('gen.prompt.keep_language')}"
-                # Chat/style modes need more tokens (conversation arrays / creative content)
-                n_predict = 4096 if args.mode in ("style", "chat") else 2048
-                api_result = call_ollama(args.model, system_prompt, user_msg, temperature=temp, num_predict=n_predict)
+                if not pending.done():
+                    flush_events()
+                api_result = pending.result()
 
                 # Extract text from response (handles both content and thinking fields)
                 response_text = extract_text_from_response(api_result)
@@ -622,7 +1075,8 @@ def main():
                 if data:
                     # Guardrail: keep generated language/script aligned with source text.
                     src_script = dominant_script(text)
-                    out_script = dominant_script(collect_output_text(data, args.mode))
+                    collected_output = collect_output_text(data, args.mode)
+                    out_script = dominant_script(collected_output)
                     if src_script in ("latin", "cjk") and out_script in ("latin", "cjk") and src_script != out_script:
                         emit("log", message=t("gen.lang_mismatch", src=src_script, out=out_script))
                         # For tiny batches, keep the sample to avoid hard-fail all segments.
@@ -650,11 +1104,12 @@ def main():
                     chat_data = to_chat_format(data, args.mode)
                     if chat_data:
                         success_count += 1
-                        output_lengths.append(len(collect_output_text(data, args.mode)))
+                        output_lengths.append(len(collected_output))
                         # Incremental write
-                        train_file.write(json.dumps(chat_data, ensure_ascii=False) + "\n")
-                        train_file.flush()
-                        emit("log", message=t("gen.success", count=success_count, preview=str(list(data.values())[0])[:60]))
+                        line = (json.dumps(chat_data, ensure_ascii=False) + "\n").encode("utf-8")
+                        write_record(line)
+                        cache_file.write(f"{segment_keys[i]}\t{len(collected_output)}\t".encode("ascii") + line)
+                        emit("log", message=t("gen.success", count=success_count, preview=str(next(iter(data.values())))[:60]))
                     else:
                         failed += 1
                         failed_records.append({**segment_record, "reason": "schema_mismatch"})
@@ -677,7 +1132,19 @@ def main():
                  desc=t("gen.progress_status", success=success_count, failed=failed))
 
     finally:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        pool.shutdown(wait=False, cancel_futures=True)
+        # Requests still running here mean the loop stopped early; abort them
+        # instead of letting interpreter exit wait out their timeouts.
+        close_chat_connections()
+        sync_train_file()
         train_file.close()
+        cache_file.close()
+        if cache_reader is not None:
+            cache_reader.close()
+
+    # Keep only this run's samples so the shared cache doesn't grow forever.
+    prune_generation_cache(cache_path, set(segment_keys))
 
     failed_path = os.path.join(dataset_dir, "failed_segments.jsonl")
     with open(failed_path, "w", encoding="utf-8") as f:
@@ -707,32 +1174,9 @@ def main():
         emit("error", message=t("gen.no_valid_data", total=total))
         sys.exit(1)
 
-    # Write valid.jsonl from the last 10% of train data
-    all_results = []
-    with open(train_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                all_results.append(line.strip())
-
-    if len(all_results) > 1:
-        split_idx = max(1, int(len(all_results) * 0.9))
-        valid_lines = all_results[split_idx:]
-        train_lines = all_results[:split_idx]
-
-        with open(train_path, "w", encoding="utf-8") as f:
-            for line in train_lines:
-                f.write(line + "\n")
-        with open(valid_path, "w", encoding="utf-8") as f:
-            for line in valid_lines:
-                f.write(line + "\n")
-
-        emit("log", message=t("gen.saved", train=len(train_lines), valid=len(valid_lines)))
-    else:
-        # Only one result, copy to both
-        with open(valid_path, "w", encoding="utf-8") as f:
-            for line in all_results:
-                f.write(line + "\n")
-        emit("log", message=t("gen.saved", train=len(all_results), valid=len(all_results)))
+    # Move the last 10% of train data into valid.jsonl
+    train_count, valid_count = split_train_valid(train_path, valid_path, record_offsets)
+    emit("log", message=t("gen.saved", train=train_count, valid=valid_count))
 
     emit("complete",
          train_count=success_count,
@@ -12,6 +12,7 @@ pub struct CleaningOptions {
     pub privacy_filter: Option<bool>,
     pub fuzzy_dedup: Option<bool>,
     pub fuzzy_dedup_threshold: Option<f64>,
+    pub near_dedup: Option<bool>,
 }
 
 #[tauri::command]
@@ -75,6 +76,7 @@ pub async fn start_cleaning(
             .fuzzy_dedup_threshold
             .unwrap_or(0.85)
             .clamp(0.5, 1.0);
+        let enable_near_dedup = clean_options.near_dedup.unwrap_or(false);
 
         let mut caffeinate_args: Vec<String> = vec![
             "-i".to_string(),
@@ -91,6 +93,9 @@ pub async fn start_cleaning(
             caffeinate_args.push("--fuzzy-threshold".to_string());
             caffeinate_args.push(format!("{:.2}", fuzzy_threshold));
         }
+        if enable_near_dedup {
+            caffeinate_args.push("--near-dedup".to_string());
+        }
         let lang_value = lang.unwrap_or_else(|| "en".to_string());
         if supports_lang {
             caffeinate_args.push("--lang".to_string());
@@ -193,6 +198,7 @@ pub async fn generate_dataset(
     quality_scoring: Option<bool>,
     retry_failed_only: Option<bool>,
     retry_version: Option<String>,
+    concurrency: Option<u32>,
 ) -> Result<String, String> {
     let executor = PythonExecutor::default();
     if !executor.is_ready() {
@@ -352,6 +358,11 @@ pub async fn generate_dataset(
         if enable_quality_scoring {
             py_args.push("--quality-scoring".to_string());
         }
+        // Parallel requests only pay off when Ollama runs with OLLAMA_NUM_PARALLEL > 1
+        if effective_source == "ollama" {
+            py_args.push("--concurrency".to_string());
+            py_args.push(concurrency.unwrap_or(1).max(1).to_string());
+        }
         if supports_lang {
             py_args.push("--lang".to_string());
             py_args.push(lang.unwrap_or_else(|| "en".to_string()));
@@ -166,7 +166,7 @@ pub async fn setup_environment(app: tauri::AppHandle) -> Result<(), String> {
 
     let pip_result = tokio::process::Command::new(&uv_path)
         .args([
-            "pip", "install", "--upgrade", "mlx-lm[train]>=0.31.2", "PyPDF2", "python-docx",
+            "pip", "install", "--upgrade", "mlx-lm[train]>=0.31.2", "orjson", "hf_transfer", "pypdfium2", "PyPDF2", "python-docx", "datasketch",
             "--python", &executor.python_bin().to_string_lossy(),
         ])
         .envs(build_uv_env())
@@ -5,10 +5,10 @@ use crate::fs::ProjectDirManager;
 use crate::python::PythonExecutor;
 use crate::commands::config::build_uv_env;
 
-/// Whether doc-parsing deps (PyPDF2, python-docx) have been checked/installed this session.
+/// Whether doc-parsing deps (pypdfium2, PyPDF2, python-docx) have been checked/installed this session.
 static DOC_DEPS_OK: OnceLock<bool> = OnceLock::new();
 
-/// Ensure PyPDF2 and python-docx are installed in the app venv.
+/// Ensure pypdfium2, PyPDF2 and python-docx are installed in the app venv.
 /// Runs the check only once per app session; auto-installs via uv if missing.
 pub fn ensure_doc_deps() {
     DOC_DEPS_OK.get_or_init(|| {
@@ -19,7 +19,7 @@ pub fn ensure_doc_deps() {
 
         // Quick check: can we import both?
         if let Ok(output) = std::process::Command::new(executor.python_bin())
-            .args(["-c", "import PyPDF2; from docx import Document"])
+            .args(["-c", "import pypdfium2, PyPDF2; from docx import Document"])
             .output()
         {
             if output.status.success() {
@@ -31,7 +31,7 @@ pub fn ensure_doc_deps() {
         if let Some(uv) = PythonExecutor::find_uv() {
             if let Ok(output) = std::process::Command::new(&uv)
                 .args([
-                    "pip", "install", "PyPDF2", "python-docx",
+                    "pip", "install", "pypdfium2", "PyPDF2", "python-docx",
                     "--python", &executor.python_bin().to_string_lossy(),
                 ])
                 .envs(build_uv_env())
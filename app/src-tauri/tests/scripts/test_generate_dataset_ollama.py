@@ -0,0 +1,232 @@
+"""Tests for generate_dataset_ollama.py against an in-process fake Ollama server.
+
+Run from the repository root:
+    python -m unittest discover -s app/src-tauri/tests/scripts
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "scripts"))
+
+import generate_dataset_ollama as gds  # noqa: E402
+
+
+class FakeOllama:
+    """/api/chat server answering every prompt with a QA pair built from it.
+
+    Prompts containing "slow" block until release() (or 30 s), like a
+    busy single-slot Ollama.
+    """
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests += 1
+                user = body["messages"][-1]["content"]
+                if "slow" in user:
+                    fake.released.wait(30)
+                marker = user.split("<<", 1)[-1].split(">>", 1)[0]
+                content = json.dumps({"question": f"What about {marker}?", "answer": f"It is {marker}."})
+                data = json.dumps({"message": {"role": "assistant", "content": content},
+                                   "done_reason": "stop"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                pass  # clients hanging up mid-request are expected here
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def release(self):
+        self.released.set()
+
+    def close(self):
+        self.release()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def reset_connections():
+    for conn in gds._http_connections:
+        conn.close()
+    gds._http_connections.clear()
+    gds._http_closing.clear()
+    gds._http_local = threading.local()
+
+
+class GenerateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(reset_connections)
+        self.ollama = FakeOllama()
+        self.addCleanup(self.ollama.close)
+        patcher = mock.patch.multiple(gds, OLLAMA_HOST="127.0.0.1", OLLAMA_PORT=self.ollama.port)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.project_dir = os.path.join(self.tmp.name, "project")
+        os.makedirs(os.path.join(self.project_dir, "cleaned"))
+
+    def write_segments(self, texts):
+        path = os.path.join(self.project_dir, "cleaned", "segments.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for i, text in enumerate(texts):
+                f.write(json.dumps({"id": i, "text": text}) + "\n")
+
+    def run_main(self, *extra, output_dir=None):
+        """Run main() in-process; return (exit code, events)."""
+        argv = ["generate_dataset_ollama.py", "--project-dir", self.project_dir,
+                "--model", "fake", "--mode", "qa", *extra]
+        if output_dir:
+            argv += ["--output-dir", output_dir]
+        # Each real run is a fresh process: reset the connection state that
+        # the previous main() closed on its way out.
+        reset_connections()
+        out = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        code = 0
+        with mock.patch.object(sys, "argv", argv), mock.patch.object(sys, "stdout", out):
+            try:
+                gds.main()
+            except SystemExit as e:
+                code = e.code
+            out.flush()
+        events = [json.loads(line) for line in out.buffer.getvalue().splitlines()]
+        return code, events
+
+
+def segment(marker, extra=""):
+    return f"Segment <<{marker}>> {extra}with enough plain English text to be sent to the model."
+
+
+def _without_numpy(func, *args):
+    with mock.patch.object(gds, "np", None):
+        return func(*args)
+
+
+@unittest.skipIf(gds.np is None, "numpy not installed")
+class LoneSurrogateTest(unittest.TestCase):
+    """Model output parsed by the json.loads fallback may hold lone surrogates."""
+
+    def test_text_similarity(self):
+        a, b = "abc\ud800def", "abc\ud800xyz"
+        self.assertAlmostEqual(gds.text_similarity(a, b), _without_numpy(gds.text_similarity, a, b))
+        self.assertEqual(gds.text_similarity("\ud800\ud800", "\ud800\ud800"), 1.0)
+
+    def test_dominant_script(self):
+        for text in ("\ud800", "latin words " * 5 + "\ud800", "中文内容" * 10 + "\udfff"):
+            self.assertEqual(gds.dominant_script(text), _without_numpy(gds.dominant_script, text))
+
+
+class GenerationCacheTest(GenerateTestCase):
+    def records(self, output_dir):
+        """Sorted sample lines of a run (train and valid together)."""
+        lines = []
+        for name in ("train.jsonl", "valid.jsonl"):
+            path = os.path.join(output_dir, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    lines += f.read().splitlines()
+        return sorted(lines)
+
+    def cache_lines(self):
+        with open(os.path.join(self.project_dir, "dataset", gds.GENERATION_CACHE_NAME), "rb") as f:
+            return f.read().splitlines()
+
+    def first_run(self, count=6):
+        self.write_segments([segment(f"s{i}") for i in range(count)])
+        output_dir = os.path.join(self.tmp.name, "run1")
+        code, _ = self.run_main(output_dir=output_dir)
+        self.assertEqual(code, 0)
+        records = self.records(output_dir)
+        self.assertEqual(len(records), count)
+        return records
+
+    def test_resume_replays_cache_into_new_output_dir(self):
+        expected = self.first_run()
+        requests = self.ollama.requests
+        output_dir = os.path.join(self.tmp.name, "run2")
+        code, _ = self.run_main("--resume", output_dir=output_dir)
+        self.assertEqual(code, 0)
+        self.assertEqual(self.records(output_dir), expected)
+        # Only the connection test reaches the model.
+        self.assertEqual(self.ollama.requests - requests, 1)
+
+    def test_resume_into_partial_output_dir_adds_no_duplicates(self):
+        expected = self.first_run()
+        output_dir = os.path.join(self.tmp.name, "run2")
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, "train.jsonl"), "wb") as f:
+            f.write(expected[4] + b"\n" + expected[1] + b"\n")
+        code, _ = self.run_main("--resume", output_dir=output_dir)
+        self.assertEqual(code, 0)
+        self.assertEqual(self.records(output_dir), expected)
+
+    def test_cache_is_pruned_to_the_last_run(self):
+        self.first_run(count=5)
+        self.assertEqual(len(self.cache_lines()), 5)
+        self.write_segments([segment("other0"), segment("other1")])
+        code, _ = self.run_main("--mode", "qa", output_dir=os.path.join(self.tmp.name, "run2"))
+        self.assertEqual(code, 0)
+        cache = self.cache_lines()
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(all(b"other" in line for line in cache))
+
+
+class UnexpectedErrorTest(GenerateTestCase):
+    def test_in_flight_requests_are_aborted(self):
+        self.write_segments([segment("first"), segment("second", "slow "), segment("third", "slow ")])
+
+        real_emit = gds.emit
+
+        def failing_emit(event_type, **kwargs):
+            # The progress event after segment 1 is outside the per-segment try.
+            if event_type == "progress" and kwargs.get("step") == 1 and "total" in kwargs:
+                raise RuntimeError("boom")
+            real_emit(event_type, **kwargs)
+
+        started = time.monotonic()
+        with mock.patch.object(gds, "emit", failing_emit):
+            with self.assertRaisesRegex(RuntimeError, "boom"):
+                self.run_main("--concurrency", "3")
+
+        # The two slow requests were in flight; their worker threads must
+        # finish now rather than when the server (or the timeout) lets go.
+        for thread in threading.enumerate():
+            if thread.name.startswith("ThreadPoolExecutor"):
+                thread.join(5)
+                self.assertFalse(thread.is_alive(), f"{thread.name} still blocked in post_chat")
+        self.assertLess(time.monotonic() - started, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
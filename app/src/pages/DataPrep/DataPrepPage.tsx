@@ -210,7 +210,9 @@ export function DataPrepPage() {
     formEnablePrivacyFilter: enablePrivacyFilter,
     formEnableFuzzyDedup: enableFuzzyDedup,
     formFuzzyDedupThreshold: fuzzyDedupThreshold,
+    formEnableNearDedup: enableNearDedup,
     formEnableQualityScoring: enableQualityScoring,
+    formGenConcurrency: genConcurrency,
     setFormField,
   } = useGenerationStore();
   const setGenMode = (v: string) => setFormField("formGenMode", v);
@@ -219,7 +221,9 @@ export function DataPrepPage() {
   const setEnablePrivacyFilter = (v: boolean) => setFormField("formEnablePrivacyFilter", v);
   const setEnableFuzzyDedup = (v: boolean) => setFormField("formEnableFuzzyDedup", v);
   const setFuzzyDedupThreshold = (v: number) => setFormField("formFuzzyDedupThreshold", v);
+  const setEnableNearDedup = (v: boolean) => setFormField("formEnableNearDedup", v);
   const setEnableQualityScoring = (v: boolean) => setFormField("formEnableQualityScoring", v);
+  const setGenConcurrency = (v: number) => setFormField("formGenConcurrency", v);
   const logEndRef = useRef<HTMLDivElement>(null);
   const logScrollRef = useRef<HTMLDivElement>(null);
   const previewPanelRef = useRef<HTMLDivElement>(null);
@@ -491,6 +495,7 @@ export function DataPrepPage() {
           privacyFilter: enablePrivacyFilter,
           fuzzyDedup: enableFuzzyDedup,
           fuzzyDedupThreshold: fuzzyDedupThreshold,
+          nearDedup: enableNearDedup,
         },
       });
     } catch {
@@ -580,6 +585,7 @@ export function DataPrepPage() {
           privacyFilter: enablePrivacyFilter,
           fuzzyDedup: enableFuzzyDedup,
           fuzzyDedupThreshold: fuzzyDedupThreshold,
+          nearDedup: enableNearDedup,
         },
       });
     } catch (e) {
@@ -614,6 +620,7 @@ export function DataPrepPage() {
       formGenSource,
       formGenModel,
       formEnableQualityScoring,
+      formGenConcurrency,
     } = useGenerationStore.getState();
     if (!formGenMode) {
       useGenerationStore.setState({ genError: t("generate.noModeSelected") });
@@ -636,6 +643,7 @@ export function DataPrepPage() {
         lang: i18nGlobal.language,
         qualityScoring: formEnableQualityScoring,
         retryFailedOnly: false,
+        concurrency: formGenConcurrency,
       });
     } catch (e) {
       useGenerationStore.setState({
@@ -847,6 +855,7 @@ export function DataPrepPage() {
         qualityScoring: enableQualityScoring,
         retryFailedOnly: true,
         retryVersion: version,
+        concurrency: genConcurrency,
       });
     } catch (e) {
       useGenerationStore.setState({
@@ -1414,6 +1423,18 @@ export function DataPrepPage() {
                             <input type="range" min={0.5} max={1.0} step={0.05} value={fuzzyDedupThreshold} onChange={(e) => setFuzzyDedupThreshold(Number(e.target.value))} disabled={generating || cleaning} className="w-full" />
                           </div>
                         )}
+                        <Tooltip>
+                          <TooltipTrigger asChild>
+                            <label className="flex items-center justify-between gap-2 text-xs cursor-default">
+                              <div className="flex items-center gap-2">
+                                <input type="checkbox" className="h-3.5 w-3.5 rounded border-border" checked={enableNearDedup} onChange={(e) => setEnableNearDedup(e.target.checked)} disabled={generating || cleaning} />
+                                <span className="text-foreground">{t("generate.nearDedup")}</span>
+                                <Info size={12} className="text-muted-foreground" />
+                              </div>
+                            </label>
+                          </TooltipTrigger>
+                          <TooltipContent>{t("generate.nearDedupHint")}</TooltipContent>
+                        </Tooltip>
                         <Tooltip>
                           <TooltipTrigger asChild>
                             <label className="flex items-center justify-between gap-2 text-xs cursor-default">
@@ -1426,6 +1447,23 @@ export function DataPrepPage() {
                           </TooltipTrigger>
                           <TooltipContent>{t("generate.qualityScoringHint")}</TooltipContent>
                         </Tooltip>
+                        {genSource === "ollama" && (
+                          <Tooltip>
+                            <TooltipTrigger asChild>
+                              <div className="space-y-1 text-xs cursor-default">
+                                <div className="flex items-center justify-between">
+                                  <div className="flex items-center gap-2">
+                                    <span className="text-foreground">{t("generate.concurrency")}</span>
+                                    <Info size={12} className="text-muted-foreground" />
+                                  </div>
+                                  <span className="text-[0.6875rem] text-muted-foreground">{genConcurrency}</span>
+                                </div>
+                                <input type="range" min={1} max={8} step={1} value={genConcurrency} onChange={(e) => setGenConcurrency(Number(e.target.value))} disabled={generating || cleaning} className="w-full" />
+                              </div>
+                            </TooltipTrigger>
+                            <TooltipContent>{t("generate.concurrencyHint")}</TooltipContent>
+                          </Tooltip>
+                        )}
                         <Tooltip>
                           <TooltipTrigger asChild>
                             <label className="flex items-center justify-between gap-2 text-xs cursor-default">
@@ -66,7 +66,9 @@ interface GenerationState {
   formEnablePrivacyFilter: boolean;
   formEnableFuzzyDedup: boolean;
   formFuzzyDedupThreshold: number;
+  formEnableNearDedup: boolean;
   formEnableQualityScoring: boolean;
+  formGenConcurrency: number;
 
   // Actions
   startGeneration: () => void;
@@ -108,7 +110,9 @@ export const useGenerationStore = create<GenerationState>((set, get) => ({
   formEnablePrivacyFilter: false,
   formEnableFuzzyDedup: false,
   formFuzzyDedupThreshold: 0.85,
+  formEnableNearDedup: false,
   formEnableQualityScoring: false,
+  formGenConcurrency: 1,
   newVersionIds: [],
 
   _listenersReady: false,
@@ -167,7 +171,9 @@ export const useGenerationStore = create<GenerationState>((set, get) => ({
     formEnablePrivacyFilter: false,
     formEnableFuzzyDedup: false,
     formFuzzyDedupThreshold: 0.85,
+    formEnableNearDedup: false,
     formEnableQualityScoring: false,
+    formGenConcurrency: 1,
   }),
 
   setReloadFiles: (fn) => set({ _reloadFiles: fn }),